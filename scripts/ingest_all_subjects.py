@@ -30,7 +30,7 @@ load_dotenv()
 
 from src.config import settings
 from src.ingestion.pipeline import DocumentIngestionPipeline
-from src.ingestion.subject_metadata import SUBJECT_METADATA
+from src.ingestion.subject_metadata import EMPTY_CHAPTERS, SUBJECT_METADATA
 
 # Configure logging
 logging.basicConfig(
@@ -64,7 +64,7 @@ def ingest_subject(
 
     # Get subject metadata for the specific class level
     chapter_metadata = SUBJECT_METADATA.get(class_level, {}).get(subject)
-    if not chapter_metadata:
+    if chapter_metadata is None or chapter_metadata is EMPTY_CHAPTERS:
         logger.warning(f"No metadata found for {subject} Class {class_level}, proceeding without it")
 
     # Path to subject notes
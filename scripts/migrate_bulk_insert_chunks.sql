@@ -0,0 +1,29 @@
+-- =============================================================================
+-- Migration: Bulk chunk insert function
+-- Lets the loader insert all of a chapter's chunks in one RPC call (one
+-- HTTP round trip, one transaction) instead of one POST per 100 rows.
+-- Run this in Supabase SQL Editor
+-- =============================================================================
+
+-- payload is a JSON array of {chapter_id, chunk_text, chunk_index,
+-- embedding, metadata} objects; returns the number of rows inserted.
+-- Embeddings arrive as JSON arrays, whose text form is also valid vector
+-- input; the vector -> halfvec assignment cast covers tables already moved
+-- to halfvec(768) by migrate_to_halfvec.sql.
+CREATE OR REPLACE FUNCTION insert_chunks_bulk(payload jsonb)
+RETURNS int
+LANGUAGE sql
+AS $$
+    WITH inserted AS (
+        INSERT INTO document_chunks (chapter_id, chunk_text, chunk_index, embedding, metadata)
+        SELECT
+            (elem->>'chapter_id')::uuid,
+            elem->>'chunk_text',
+            (elem->>'chunk_index')::int,
+            (elem->>'embedding')::vector,
+            COALESCE(elem->'metadata', '{}'::jsonb)
+        FROM jsonb_array_elements(payload) AS elem
+        RETURNING 1
+    )
+    SELECT count(*)::int FROM inserted;
+$$;
@@ -0,0 +1,58 @@
+-- =============================================================================
+-- Migration: Filter search_chunks results by similarity on the server
+-- Run this in Supabase SQL Editor
+-- =============================================================================
+
+-- Step 1: Drop the old function (the signature changes, so CREATE OR REPLACE
+-- would leave an ambiguous overload behind)
+DROP FUNCTION IF EXISTS search_chunks;
+
+-- Step 2: Rebuild the HNSW index with explicit build parameters
+DROP INDEX IF EXISTS idx_chunks_embedding;
+CREATE INDEX idx_chunks_embedding
+ON document_chunks
+USING hnsw (embedding vector_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- Step 3: Recreate the search function with a min_similarity cutoff, so rows
+-- below the threshold never leave the database
+CREATE OR REPLACE FUNCTION search_chunks(
+    query_embedding vector(768),
+    match_count int DEFAULT 5,
+    filter_class int DEFAULT NULL,
+    filter_subject text DEFAULT NULL,
+    filter_chapters int[] DEFAULT NULL,
+    min_similarity float DEFAULT NULL
+)
+RETURNS TABLE (
+    chunk_id UUID,
+    chunk_text TEXT,
+    chapter_number INT,
+    chapter_title VARCHAR(500),
+    similarity FLOAT,
+    metadata JSONB
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        dc.id AS chunk_id,
+        dc.chunk_text,
+        c.chapter_number,
+        c.chapter_title,
+        (1 - (dc.embedding <=> query_embedding))::FLOAT AS similarity,
+        dc.metadata
+    FROM document_chunks dc
+    JOIN chapters c ON dc.chapter_id = c.id
+    WHERE
+        (filter_class IS NULL OR c.class_level = filter_class)
+        AND (filter_subject IS NULL OR c.subject = filter_subject)
+        AND (filter_chapters IS NULL OR c.chapter_number = ANY(filter_chapters))
+        AND (min_similarity IS NULL OR 1 - (dc.embedding <=> query_embedding) >= min_similarity)
+    ORDER BY dc.embedding <=> query_embedding
+    LIMIT match_count;
+END;
+$$;
+
+-- Done! RAGRetriever passes min_similarity = SIMILARITY_THRESHOLD.
@@ -0,0 +1,63 @@
+-- =============================================================================
+-- Migration: Store chunk embeddings as halfvec(768) (FP16)
+-- Halves table/index size and the bytes moved per search; cosine ranking on
+-- short chunks is effectively unchanged.
+-- Run this in Supabase SQL Editor (requires pgvector >= 0.7.0)
+-- =============================================================================
+
+-- Step 1: Drop the index and function that reference vector(768)
+DROP INDEX IF EXISTS idx_chunks_embedding;
+DROP FUNCTION IF EXISTS search_chunks;
+
+-- Step 2: Convert the column in place (existing embeddings are kept)
+ALTER TABLE document_chunks
+ALTER COLUMN embedding TYPE halfvec(768) USING embedding::halfvec(768);
+
+-- Step 3: Rebuild the HNSW index on halfvec
+CREATE INDEX idx_chunks_embedding
+ON document_chunks
+USING hnsw (embedding halfvec_cosine_ops)
+WITH (m = 16, ef_construction = 64);
+
+-- Step 4: Recreate the search function; the query embedding is cast to
+-- halfvec on the way in, so clients keep sending plain float lists
+CREATE OR REPLACE FUNCTION search_chunks(
+    query_embedding halfvec(768),
+    match_count int DEFAULT 5,
+    filter_class int DEFAULT NULL,
+    filter_subject text DEFAULT NULL,
+    filter_chapters int[] DEFAULT NULL,
+    min_similarity float DEFAULT NULL
+)
+RETURNS TABLE (
+    chunk_id UUID,
+    chunk_text TEXT,
+    chapter_number INT,
+    chapter_title VARCHAR(500),
+    similarity FLOAT,
+    metadata JSONB
+)
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    RETURN QUERY
+    SELECT
+        dc.id AS chunk_id,
+        dc.chunk_text,
+        c.chapter_number,
+        c.chapter_title,
+        (1 - (dc.embedding <=> query_embedding))::FLOAT AS similarity,
+        dc.metadata
+    FROM document_chunks dc
+    JOIN chapters c ON dc.chapter_id = c.id
+    WHERE
+        (filter_class IS NULL OR c.class_level = filter_class)
+        AND (filter_subject IS NULL OR c.subject = filter_subject)
+        AND (filter_chapters IS NULL OR c.chapter_number = ANY(filter_chapters))
+        AND (min_similarity IS NULL OR 1 - (dc.embedding <=> query_embedding) >= min_similarity)
+    ORDER BY dc.embedding <=> query_embedding
+    LIMIT match_count;
+END;
+$$;
+
+-- Done! New inserts of float lists are cast to halfvec by Postgres.
@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Embed every chapter's metadata and write the sidecar files shipped with
+src/ingestion (chapter_embeddings.npy + chapter_embeddings.json).
+
+Usage:
+    python scripts/precompute_chapter_embeddings.py
+
+Re-run after editing src/ingestion/chapters.json; chapters whose text
+changed are otherwise embedded at runtime.
+"""
+import sys
+import logging
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+from src.config import settings
+from src.ingestion.chapter_embeddings import PRECOMPUTED_NPY, save_precomputed
+from src.ingestion.embedding_generator import EmbeddingGenerator
+
+logging.basicConfig(
+    level=logging.INFO,
+    format="%(asctime)s - %(levelname)s - %(message)s",
+)
+logger = logging.getLogger(__name__)
+
+
+def main():
+    embedder = EmbeddingGenerator(
+        settings.embedding_model,
+        api_keys=settings.gemini_key_list,
+    )
+    rows = save_precomputed(embedder)
+    logger.info(f"Wrote {rows} chapter embeddings to {PRECOMPUTED_NPY}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,6 @@
 -- =============================================================================
 -- Supabase Schema for RAG Pipeline
--- Run this in your Supabase SQL Editor
+-- Run this in your Supabase SQL Editor (requires pgvector >= 0.7.0 for halfvec)
 -- =============================================================================
 
 -- Enable pgvector extension
@@ -35,8 +35,9 @@ CREATE TABLE IF NOT EXISTS document_chunks (
     chunk_text TEXT NOT NULL,
     chunk_index INTEGER NOT NULL,
 
-    -- Embedding (768 dimensions for Gemini text-embedding-004)
-    embedding vector(768),
+    -- Embedding (768 dimensions from Gemini, stored as FP16; the loader
+    -- rounds values to float16 before sending them)
+    embedding halfvec(768),
 
     -- Metadata for filtering and display
     metadata JSONB DEFAULT '{}',
@@ -50,7 +51,7 @@ CREATE TABLE IF NOT EXISTS document_chunks (
 -- Indexes for performance
 -- =============================================================================
 CREATE INDEX IF NOT EXISTS idx_chunks_chapter_id ON document_chunks(chapter_id);
-CREATE INDEX IF NOT EXISTS idx_chunks_embedding ON document_chunks USING hnsw (embedding vector_cosine_ops);
+CREATE INDEX IF NOT EXISTS idx_chunks_embedding ON document_chunks USING hnsw (embedding halfvec_cosine_ops) WITH (m = 16, ef_construction = 64);
 CREATE INDEX IF NOT EXISTS idx_chapters_class_subject ON chapters(class_level, subject);
 
 -- =============================================================================
@@ -73,15 +74,18 @@ CREATE TRIGGER update_chapters_updated_at
 
 -- =============================================================================
 -- RPC Function: search_chunks - Vector similarity search
+-- The query embedding is cast to halfvec on the way in, so clients send
+-- plain float lists
 -- =============================================================================
 DROP FUNCTION IF EXISTS search_chunks;
 
 CREATE OR REPLACE FUNCTION search_chunks(
-    query_embedding vector(768),
+    query_embedding halfvec(768),
     match_count int DEFAULT 5,
     filter_class int DEFAULT NULL,
     filter_subject text DEFAULT NULL,
-    filter_chapters int[] DEFAULT NULL
+    filter_chapters int[] DEFAULT NULL,
+    min_similarity float DEFAULT NULL
 )
 RETURNS TABLE (
     chunk_id UUID,
@@ -108,11 +112,38 @@ BEGIN
         (filter_class IS NULL OR c.class_level = filter_class)
         AND (filter_subject IS NULL OR c.subject = filter_subject)
         AND (filter_chapters IS NULL OR c.chapter_number = ANY(filter_chapters))
+        AND (min_similarity IS NULL OR 1 - (dc.embedding <=> query_embedding) >= min_similarity)
     ORDER BY dc.embedding <=> query_embedding
     LIMIT match_count;
 END;
 $$;
 
+-- =============================================================================
+-- RPC Function: insert_chunks_bulk - Insert a chapter's chunks in one call
+-- =============================================================================
+-- payload is a JSON array of {chapter_id, chunk_text, chunk_index,
+-- embedding, metadata} objects; returns the number of rows inserted.
+-- Embeddings arrive as JSON arrays, whose text form is also valid vector
+-- input; the vector -> halfvec assignment cast stores them in the
+-- halfvec(768) column.
+CREATE OR REPLACE FUNCTION insert_chunks_bulk(payload jsonb)
+RETURNS int
+LANGUAGE sql
+AS $$
+    WITH inserted AS (
+        INSERT INTO document_chunks (chapter_id, chunk_text, chunk_index, embedding, metadata)
+        SELECT
+            (elem->>'chapter_id')::uuid,
+            elem->>'chunk_text',
+            (elem->>'chunk_index')::int,
+            (elem->>'embedding')::vector,
+            COALESCE(elem->'metadata', '{}'::jsonb)
+        FROM jsonb_array_elements(payload) AS elem
+        RETURNING 1
+    )
+    SELECT count(*)::int FROM inserted;
+$$;
+
 -- =============================================================================
 -- Seed data: Physics Class 9 chapter metadata
 -- =============================================================================
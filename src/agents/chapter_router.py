@@ -5,7 +5,7 @@ Routes student queries to relevant chapters using:
 1. LLM analysis of query intent and topics
 2. Chapter metadata matching
 """
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Mapping
 from dataclasses import dataclass
 import json
 import re
@@ -94,8 +94,8 @@ class ChapterRouterAgent:
             "keywords": [
                 "push",
                 "pull",
-                "F=ma",
-                "Newton",
+                "f=ma",
+                "newton",
                 "momentum",
                 "friction",
                 "circular",
@@ -144,7 +144,7 @@ class ChapterRouterAgent:
                 "planet",
                 "satellite",
                 "orbit",
-                "G",
+                "g",
             ],
         },
         6: {
@@ -468,14 +468,14 @@ Rules:
             topics_identified=plan.get("topics_identified", []),
         )
 
-    def _build_chapter_index(self, subject_chapters: Dict) -> Dict:
+    def _build_chapter_index(self, subject_chapters: Mapping[int, Mapping[str, Any]]) -> Dict:
         """Build chapter index from subject metadata."""
         chapter_index = {}
         for chapter_num, metadata in subject_chapters.items():
             chapter_index[chapter_num] = {
                 "title": metadata.get("title", f"Chapter {chapter_num}"),
                 "topics": metadata.get("topics", []),
-                "keywords": metadata.get("topics", []),  # Use topics as keywords
+                "keywords": metadata.get("topics_lc", []),  # Lowercased topics as keywords
             }
         return chapter_index
 
@@ -491,7 +491,7 @@ Rules:
         return "\n".join(lines)
 
     def _extract_keywords(self, query: str, chapter_index: Dict = None) -> List[str]:
-        """Extract keywords from query for matching."""
+        """Extract keywords from query for matching (keywords are stored lowercase)."""
         if chapter_index is None:
             chapter_index = self.CHAPTER_INDEX
 
@@ -500,7 +500,7 @@ Rules:
 
         for chapter_info in chapter_index.values():
             for keyword in chapter_info.get("keywords", []):
-                if keyword.lower() in query_lower:
+                if keyword in query_lower:
                     keywords.append(keyword)
 
         return list(set(keywords))
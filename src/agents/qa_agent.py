@@ -1,7 +1,7 @@
 """
 Question-Answering Agent using RAG context.
 """
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Iterator, Optional, Tuple
 from dataclasses import dataclass, field
 import json
 from .chapter_router import ChapterRouterAgent, RoutingResult
@@ -72,8 +72,101 @@ class QAAgent:
         Returns:
             QAResponse with answer and sources
         """
+        retrieval_query, routing, chunks = self._prepare(
+            query, class_level, subject, history or []
+        )
+
+        # Step 4: Generate answer with RAG context (using ORIGINAL query)
+        answer_result = self._generate_answer(
+            query=query,
+            chunks=chunks,
+            class_level=class_level,
+            language=language,
+            subject=subject,
+            history=history or [],
+        )
+
+        return QAResponse(
+            answer=answer_result.get("answer", "I couldn't find an answer."),
+            explanation=answer_result.get("explanation", ""),
+            sources=self._build_sources(chunks),
+            confidence=min(
+                routing.confidence, answer_result.get("confidence", 0.8)
+            ),
+            chapter_used=routing.primary_chapter,
+            routing_info=routing,
+            revised_query=retrieval_query,
+        )
+
+    def answer_stream(
+        self,
+        query: str,
+        class_level: int = 9,
+        subject: str = "Physics",
+        language: str = "en",
+        history: List[Dict[str, str]] = None,
+    ) -> Iterator[Tuple[str, Any]]:
+        """
+        Answer a student's question, streaming the answer as it is generated.
+
+        Yields ("delta", text) for each piece of the answer, then a final
+        ("done", QAResponse) carrying sources, confidence and the full answer.
+        """
+        retrieval_query, routing, chunks = self._prepare(
+            query, class_level, subject, history or []
+        )
+
+        messages = self._build_messages(
+            query=query,
+            chunks=chunks,
+            class_level=class_level,
+            language=language,
+            subject=subject,
+            history=history or [],
+            json_output=False,
+        )
+
+        parts = []
+        if messages is None:
+            parts.append("I couldn't find relevant information to answer your question.")
+            yield "delta", parts[0]
+        else:
+            stream = self.llm.chat.completions.create(
+                model=self.model,
+                messages=messages,
+                temperature=0.5,
+                max_tokens=1000,
+                stream=True,
+            )
+            for chunk in stream:
+                if not chunk.choices:
+                    continue
+                delta = chunk.choices[0].delta.content
+                if delta:
+                    parts.append(delta)
+                    yield "delta", delta
+
+        yield "done", QAResponse(
+            answer="".join(parts),
+            explanation="",
+            sources=self._build_sources(chunks),
+            confidence=routing.confidence if chunks else 0.3,
+            chapter_used=routing.primary_chapter,
+            routing_info=routing,
+            revised_query=retrieval_query,
+            agent_used="qa",
+        )
+
+    def _prepare(
+        self,
+        query: str,
+        class_level: int,
+        subject: str,
+        history: List[Dict[str, str]],
+    ) -> Tuple[str, RoutingResult, List[RetrievedChunk]]:
+        """Rewrite, route and retrieve — everything before answer generation."""
         # Step 1: Rewrite query for better retrieval (needs history to resolve follow-ups)
-        retrieval_query = self._rewrite_query(query, subject, history or [])
+        retrieval_query = self._rewrite_query(query, subject, history)
 
         # Step 2: Route to relevant chapters (using rewritten query)
         routing = self.router.route(
@@ -93,18 +186,12 @@ class QAAgent:
             top_k=5,
         )
 
-        # Step 4: Generate answer with RAG context (using ORIGINAL query)
-        answer_result = self._generate_answer(
-            query=query,
-            chunks=chunks,
-            class_level=class_level,
-            language=language,
-            subject=subject,
-            history=history or [],
-        )
+        return retrieval_query, routing, chunks
 
-        # Build sources
-        sources = [
+    @staticmethod
+    def _build_sources(chunks: List[RetrievedChunk]) -> List[Dict[str, Any]]:
+        """Build source citations for the top chunks."""
+        return [
             {
                 "chapter": chunk.chapter_number,
                 "title": chunk.chapter_title,
@@ -116,18 +203,6 @@ class QAAgent:
             for chunk in chunks[:3]
         ]
 
-        return QAResponse(
-            answer=answer_result.get("answer", "I couldn't find an answer."),
-            explanation=answer_result.get("explanation", ""),
-            sources=sources,
-            confidence=min(
-                routing.confidence, answer_result.get("confidence", 0.8)
-            ),
-            chapter_used=routing.primary_chapter,
-            routing_info=routing,
-            revised_query=retrieval_query,
-        )
-
     @track
     def _rewrite_query(self, query: str, subject: str, history: List[Dict[str, str]]) -> str:
         """
@@ -177,15 +252,50 @@ class QAAgent:
         history: List[Dict[str, str]] = None,
     ) -> Dict[str, Any]:
         """Generate answer using LLM with RAG context and chat history."""
+        messages = self._build_messages(
+            query=query,
+            chunks=chunks,
+            class_level=class_level,
+            language=language,
+            subject=subject,
+            history=history,
+        )
 
         # Hard bail only if we have nothing at all — no chunks AND no history
-        if not chunks and not history:
+        if messages is None:
             return {
                 "answer": "I couldn't find relevant information to answer your question.",
                 "explanation": "",
                 "confidence": 0.3,
             }
 
+        response = self.llm.chat.completions.create(
+            model=self.model,
+            messages=messages,
+            temperature=0.5,
+            max_tokens=1000,
+        )
+
+        return self._parse_json(response.choices[0].message.content)
+
+    def _build_messages(
+        self,
+        query: str,
+        chunks: List[RetrievedChunk],
+        class_level: int,
+        language: str,
+        subject: str = "Physics",
+        history: List[Dict[str, str]] = None,
+        json_output: bool = True,
+    ) -> Optional[List[Dict[str, str]]]:
+        """
+        Build the answer prompt. Returns None when there is nothing to answer
+        from (no chunks and no history). With json_output=False the model is
+        asked for plain text, which is what the streaming endpoint shows.
+        """
+        if not chunks and not history:
+            return None
+
         language_instruction = ""
         if language == "ur":
             language_instruction = "Respond in Urdu."
@@ -198,8 +308,8 @@ class QAAgent:
             f"You are a helpful {subject} tutor for Class {class_level} students (FBISE syllabus). "
             f"You ONLY answer questions related to {subject}. "
             f"If a student asks something outside of {subject}, politely tell them this is a {subject} tutor and suggest they switch to the correct subject. "
-            "Always respond with JSON. "
-            "Use the conversation history to maintain context. "
+            + ("Always respond with JSON. " if json_output else "")
+            + "Use the conversation history to maintain context. "
             "If reference material is provided, prefer it. "
             "If no reference material is available but the conversation history covers the topic, answer from that."
         )
@@ -242,7 +352,8 @@ Instructions:
 4. If you don't have enough context to answer, say so
 5. Keep the answer concise but complete (2-3 paragraphs max)"""
 
-        current_prompt += f"""
+        if json_output:
+            current_prompt += f"""
 
 Respond with ONLY valid JSON:
 {{
@@ -253,15 +364,7 @@ Respond with ONLY valid JSON:
 }}"""
 
         messages.append({"role": "user", "content": current_prompt})
-
-        response = self.llm.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=0.5,
-            max_tokens=1000,
-        )
-
-        return self._parse_json(response.choices[0].message.content)
+        return messages
 
     @staticmethod
     def _extract_answer_from_raw(text: str) -> str:
@@ -3,8 +3,13 @@ RAG Retriever with chapter-scoped search.
 """
 from typing import List, Dict, Any
 from dataclasses import dataclass
+import json
 import logging
+
+import numpy as np
+
 from ..services.opik_setup import get_track_decorator
+from ..services.supabase_client import is_missing_rpc
 from ..ingestion.embedding_generator import EmbeddingGenerator
 
 track = get_track_decorator()
@@ -12,6 +17,10 @@ track = get_track_decorator()
 
 logger = logging.getLogger(__name__)
 
+# Most chunks whose embeddings _fallback_search downloads and ranks; kept
+# under PostgREST's default max-rows (1000) so the cap is ours, not the server's
+FALLBACK_MAX_CANDIDATES = 500
+
 
 @dataclass
 class RetrievedChunk:
@@ -47,6 +56,9 @@ class RAGRetriever:
         self.top_k = top_k
         self.similarity_threshold = similarity_threshold
         self.debug = debug
+        # Cleared if search_chunks predates migrate_search_min_similarity.sql;
+        # retrieve() applies the threshold in Python either way
+        self._rpc_min_similarity = True
 
     @track
     def retrieve(
@@ -130,11 +142,13 @@ class RAGRetriever:
         Execute vector similarity search using Supabase RPC.
         """
         params = {
-            "query_embedding": query_embedding,
+            "query_embedding": list(map(float, query_embedding)),
             "match_count": top_k,
             "filter_class": class_level,
             "filter_subject": subject,
         }
+        if self._rpc_min_similarity:
+            params["min_similarity"] = self.similarity_threshold
 
         if chapter_numbers:
             params["filter_chapters"] = chapter_numbers
@@ -147,8 +161,16 @@ class RAGRetriever:
             result = self.supabase.rpc("search_chunks", params).execute()
             return result.data or []
         except Exception as e:
-            if self.debug:
-                print(f"[RETRIEVER] RPC Error: {e}")
+            if self._rpc_min_similarity and is_missing_rpc(e):
+                logger.warning(
+                    "search_chunks does not accept min_similarity; run "
+                    "scripts/migrate_search_min_similarity.sql. Retrying without it."
+                )
+                self._rpc_min_similarity = False
+                return self._vector_search(
+                    query_embedding, class_level, subject, chapter_numbers, top_k
+                )
+            logger.warning(f"search_chunks RPC failed, using fallback search: {e}")
             # Fallback: direct query without RPC
             return self._fallback_search(query_embedding, class_level, subject, chapter_numbers, top_k)
 
@@ -183,32 +205,65 @@ class RAGRetriever:
         if not chapters:
             return []
 
-        # Get chunks for these chapters
-        chunks_result = self.supabase.table("document_chunks").select(
-            "chunk_text, chapter_id, metadata"
-        ).in_("chapter_id", list(chapters.keys())).limit(top_k * 5).execute()
+        # Ids and embeddings only, for at most FALLBACK_MAX_CANDIDATES chunks;
+        # texts are fetched below for the top_k winners alone
+        candidates_result = self.supabase.table("document_chunks").select(
+            "id, embedding"
+        ).in_("chapter_id", list(chapters.keys())).limit(FALLBACK_MAX_CANDIDATES).execute()
+        if len(candidates_result.data) >= FALLBACK_MAX_CANDIDATES:
+            logger.warning(
+                f"Fallback search ranked only the first {FALLBACK_MAX_CANDIDATES} "
+                f"chunks of {len(chapters)} chapter(s); results may be incomplete"
+            )
+        rows = [r for r in candidates_result.data if r.get("embedding")]
 
         if self.debug:
-            print(f"[RETRIEVER] Found {len(chunks_result.data)} chunks")
+            print(f"[RETRIEVER] Found {len(rows)} chunks")
 
-        # Manual similarity calculation (cosine)
-        import numpy as np
-        query_vec = np.array(query_embedding)
+        if not rows:
+            return []
+
+        # Cosine similarity for all chunks in one matrix-vector product
+        matrix = np.array(
+            [self._parse_embedding(r["embedding"]) for r in rows], dtype=np.float32
+        )
+        matrix /= np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+        query_vec = np.asarray(query_embedding, dtype=np.float32)
+        query_vec = query_vec / max(float(np.linalg.norm(query_vec)), 1e-12)
+        scores = matrix @ query_vec
+
+        k = min(top_k, len(rows))
+        idx = np.argpartition(-scores, k - 1)[:k]
+        idx = idx[np.argsort(-scores[idx])]
+
+        top_ids = [rows[i]["id"] for i in idx]
+        texts_result = self.supabase.table("document_chunks").select(
+            "id, chunk_text, chapter_id, metadata"
+        ).in_("id", top_ids).execute()
+        by_id = {r["id"]: r for r in texts_result.data}
 
         results = []
-        for chunk in chunks_result.data:
+        for i, chunk_id in zip(idx, top_ids):
+            chunk = by_id.get(chunk_id)
+            if chunk is None:  # deleted between the two queries
+                continue
             chapter = chapters.get(chunk["chapter_id"], {})
-            # For fallback, we can't calculate similarity without embeddings in response
-            # Just return with similarity=0.5 as placeholder
             results.append({
                 "chunk_text": chunk["chunk_text"],
                 "chapter_number": chapter.get("chapter_number", 0),
                 "chapter_title": chapter.get("chapter_title", "Unknown"),
-                "similarity": 0.6,  # Placeholder
+                "similarity": float(scores[i]),
                 "metadata": chunk.get("metadata", {}),
             })
 
-        return results[:top_k]
+        return results
+
+    @staticmethod
+    def _parse_embedding(value) -> List[float]:
+        """pgvector columns come back from PostgREST as '[0.1,0.2,...]' strings."""
+        if isinstance(value, str):
+            return json.loads(value)
+        return value
 
     def retrieve_with_expansion(
         self,
@@ -5,21 +5,26 @@ Run with:
     uvicorn src.api.main:app --reload --port 8000
 """
 import asyncio
+import json
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
 from dotenv import load_dotenv
 load_dotenv()  # Load .env before other imports
 
 from fastapi import FastAPI, HTTPException, Depends, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, FileResponse
+from fastapi.responses import HTMLResponse, JSONResponse, RedirectResponse, FileResponse, StreamingResponse
+from starlette.concurrency import iterate_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 from pathlib import Path
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, contextmanager
 
-from ..config import settings
+from ..config import settings, cfg
 from ..services.groq_client import get_groq_client
 from ..services.supabase_client import get_supabase_client, get_supabase_admin_client
 from ..services.opik_setup import setup_opik
-from ..services.chat_logger import log_chat, build_chat_log_row
+from ..services.chat_logger import log_chats, build_chat_log_row
 from ..ingestion.embedding_generator import EmbeddingGenerator
 from ..agents.chapter_router import ChapterRouterAgent
 from ..agents.rag_retriever import RAGRetriever
@@ -41,9 +46,107 @@ math_orchestrator: MathOrchestrator = None
 
 TEMPLATES = Path(__file__).parent / "templates"
 
+logger = logging.getLogger(__name__)
+
+_package_logger = logging.getLogger(__name__.partition(".")[0])
+_package_logger.setLevel(settings.log_level.upper())
+
+
+@contextmanager
+def _queued_logging():
+    """
+    For the app's lifetime, format and write log records on a listener
+    thread, so a slow stdout pipe never blocks the event loop. The handler
+    sits on the package logger, so agents and services log through it as
+    well; both are removed again on exit, so each lifespan starts and stops
+    its own listener.
+    """
+    log_queue: queue.Queue = queue.Queue(-1)
+    stream = logging.StreamHandler()
+    stream.setFormatter(logging.Formatter("%(asctime)s %(levelname)s %(name)s: %(message)s"))
+    listener = QueueListener(log_queue, stream)
+    handler = QueueHandler(log_queue)
+    _package_logger.addHandler(handler)
+    _package_logger.propagate = False
+    listener.start()
+    try:
+        yield
+    finally:
+        _package_logger.removeHandler(handler)
+        _package_logger.propagate = True
+        listener.stop()
+
+# Longest startup waits on the connection warm-up
+PREWARM_TIMEOUT = 10.0
+
+# Chat log rows are queued by the request handlers and written in batches
+LOG_QUEUE_SIZE = 10000
+LOG_BATCH_SIZE = 50
+
+
+async def _log_writer(log_queue: asyncio.Queue):
+    """Drain the chat log queue, inserting up to LOG_BATCH_SIZE rows per request."""
+    while True:
+        batch = [await log_queue.get()]
+        while len(batch) < LOG_BATCH_SIZE:
+            try:
+                batch.append(log_queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        await asyncio.to_thread(log_chats, batch)
+
+
+def _enqueue_chat_log(row: dict):
+    """Queue a chat log row without waiting; drop it if the writer is far behind."""
+    try:
+        app.state.log_queue.put_nowait(row)
+    except asyncio.QueueFull:
+        logger.warning("chat log queue full, dropping row")
+
+
+async def _prewarm(groq_client, supabase_client, embedder: EmbeddingGenerator):
+    """
+    Open the Groq, Gemini and Supabase connections before the first /chat
+    request, so it doesn't pay the DNS lookup and TLS handshake. Each ping
+    is a single metadata call (no completion is billed, no retry loops),
+    and startup waits at most PREWARM_TIMEOUT seconds; failures are logged.
+    """
+    async def ping_groq():
+        await asyncio.to_thread(groq_client.warm_up, PREWARM_TIMEOUT)
+
+    async def ping_gemini():
+        await asyncio.to_thread(embedder.warm_up)
+
+    async def ping_supabase():
+        await asyncio.to_thread(
+            supabase_client.table("chapters").select("id").limit(1).execute
+        )
+
+    try:
+        results = await asyncio.wait_for(
+            asyncio.gather(
+                ping_groq(), ping_gemini(), ping_supabase(), return_exceptions=True
+            ),
+            PREWARM_TIMEOUT,
+        )
+    except asyncio.TimeoutError:
+        logger.warning("Warm-up not done after %gs, starting anyway", PREWARM_TIMEOUT)
+        return
+    for name, result in zip(("Groq", "Gemini", "Supabase"), results):
+        if isinstance(result, Exception):
+            logger.warning("%s warm-up failed: %s", name, result)
+
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
+    """Run the app with queued logging and the RAG pipeline."""
+    with _queued_logging():
+        async with _pipeline(app):
+            yield
+
+
+@asynccontextmanager
+async def _pipeline(app: FastAPI):
     """Initialize RAG pipeline on startup."""
     global qa_agent, math_orchestrator
 
@@ -55,6 +158,9 @@ async def lifespan(app: FastAPI):
     if not settings.supabase_url or not settings.supabase_key:
         raise RuntimeError("SUPABASE_URL and SUPABASE_KEY must be set in .env")
 
+    app.state.cfg = cfg
+    app.state.log_queue = asyncio.Queue(maxsize=LOG_QUEUE_SIZE)
+
     # Initialize clients
     setup_opik()
     groq_client = get_groq_client()
@@ -66,8 +172,8 @@ async def lifespan(app: FastAPI):
     retriever = RAGRetriever(
         supabase_client=supabase_client,
         embedding_generator=embedder,
-        top_k=settings.max_rag_results,
-        similarity_threshold=settings.similarity_threshold,
+        top_k=cfg.max_rag_results,
+        similarity_threshold=cfg.similarity_threshold,
         debug=False,
     )
     qa_agent = QAAgent(
@@ -97,10 +203,25 @@ async def lifespan(app: FastAPI):
         model_fast=settings.groq_model_fast,
     )
 
-    print("RAG pipeline initialized successfully!")
+    await _prewarm(groq_client, supabase_client, embedder)
+
+    log_writer = asyncio.create_task(_log_writer(app.state.log_queue))
+
+    logger.info("RAG pipeline initialized successfully!")
     yield
     # Cleanup (if needed)
-    print("Shutting down...")
+    logger.info("Shutting down...")
+
+    # Stop the writer and flush whatever is still queued
+    log_writer.cancel()
+    try:
+        await log_writer
+    except asyncio.CancelledError:
+        pass
+    pending = []
+    while not app.state.log_queue.empty():
+        pending.append(app.state.log_queue.get_nowait())
+    await asyncio.to_thread(log_chats, pending)
 
 
 app = FastAPI(
@@ -111,12 +232,14 @@ app = FastAPI(
 )
 
 # CORS middleware
+# An explicit origin (not "*") lets browsers cache the preflight for max_age
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=["*"],
+    allow_origins=[settings.frontend_origin],
     allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST", "DELETE"],
+    allow_headers=["Authorization", "Content-Type"],
+    max_age=86400,
 )
 
 
@@ -165,7 +288,7 @@ async def auth_login(req: LoginRequest):
         "value": req.access_token,
         "httponly": True,
         "samesite": "lax",
-        "secure": settings.app_env != "development",
+        "secure": cfg.secure_cookies,
         "path": "/",
     }
     if req.remember_me:
@@ -287,7 +410,7 @@ async def auth_refresh(request: Request):
     cookie_params = {
         "httponly": True,
         "samesite": "lax",
-        "secure": settings.app_env != "development",
+        "secure": cfg.secure_cookies,
         "path": "/",
     }
     response.set_cookie(key="access_token", value=session.access_token, **cookie_params)
@@ -374,7 +497,7 @@ async def chat(request: ChatRequest, user: dict = Depends(get_current_user)):
             for src in response.sources
         ]
 
-        # Log chat interaction (run in thread to avoid blocking)
+        # Queue the chat log row; the background writer inserts it
         try:
             chat_log_row = build_chat_log_row(
                 user_id=user.get("sub", ""),
@@ -386,9 +509,9 @@ async def chat(request: ChatRequest, user: dict = Depends(get_current_user)):
                 chat_history=history,
                 response=response,
             )
-            await asyncio.to_thread(log_chat, chat_log_row)
-        except Exception as log_err:
-            print(f"[chat] logging failed: {log_err}")
+            _enqueue_chat_log(chat_log_row)
+        except Exception:
+            logger.exception("chat logging failed")
 
         return ChatResponse(
             answer=response.answer,
@@ -403,6 +526,92 @@ async def chat(request: ChatRequest, user: dict = Depends(get_current_user)):
         raise HTTPException(status_code=500, detail=f"Error processing query: {str(e)}")
 
 
+def _sse(data: dict, event: str = None) -> str:
+    """Format one Server-Sent Events message."""
+    prefix = f"event: {event}\n" if event else ""
+    return f"{prefix}data: {json.dumps(data)}\n\n"
+
+
+@app.post("/chat/stream")
+async def chat_stream(request: ChatRequest, user: dict = Depends(get_current_user)):
+    """
+    Same as /chat, but streams the answer as Server-Sent Events.
+
+    Emits `data: {"delta": ...}` messages while the answer is generated,
+    then one `event: done` message with sources, confidence and chapter.
+    """
+    if qa_agent is None:
+        raise HTTPException(status_code=503, detail="RAG pipeline not initialized")
+
+    history = [{"role": m.role, "content": m.content} for m in request.history]
+
+    def events():
+        if request.subject == "Math" and math_orchestrator is not None:
+            # Math answers are assembled from several agents; send them whole
+            response = math_orchestrator.answer(
+                query=request.query,
+                class_level=request.class_level,
+                language=request.language,
+                history=history,
+            )
+            yield "delta", response.answer
+            yield "done", response
+        else:
+            yield from qa_agent.answer_stream(
+                query=request.query,
+                class_level=request.class_level,
+                subject=request.subject,
+                language=request.language,
+                history=history,
+            )
+
+    async def event_gen():
+        response = None
+        try:
+            # The agents are synchronous; pull each event in a worker thread
+            async for kind, payload in iterate_in_threadpool(events()):
+                if kind == "delta":
+                    yield _sse({"delta": payload})
+                else:
+                    response = payload
+        except Exception as e:
+            yield _sse({"detail": f"Error processing query: {str(e)}"}, event="error")
+            return
+
+        yield _sse(
+            {
+                "explanation": response.explanation,
+                "sources": response.sources,
+                "confidence": response.confidence,
+                "chapter_used": response.chapter_used,
+                "formulas": response.formulas,
+            },
+            event="done",
+        )
+
+        # Log once the full answer has been sent
+        try:
+            chat_log_row = build_chat_log_row(
+                user_id=user.get("sub", ""),
+                user_email=user.get("email", ""),
+                class_level=request.class_level,
+                subject=request.subject,
+                language=request.language,
+                original_query=request.query,
+                chat_history=history,
+                response=response,
+            )
+            _enqueue_chat_log(chat_log_row)
+        except Exception:
+            logger.exception("chat logging failed")
+
+    return StreamingResponse(
+        event_gen(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 # ── Admin Routes ─────────────────────────────────────────────────
 
 @app.get("/admin", response_class=HTMLResponse)
@@ -499,11 +708,24 @@ async def delete_user(user_id: str, admin: dict = Depends(require_admin)):
 
 
 if __name__ == "__main__":
+    import os
     import uvicorn
 
-    uvicorn.run(
-        "src.api.main:app",
-        host=settings.api_host,
-        port=settings.api_port,
-        reload=True,
-    )
+    if settings.app_env == "development":
+        uvicorn.run(
+            "src.api.main:app",
+            host=settings.api_host,
+            port=settings.api_port,
+            reload=True,
+        )
+    else:
+        # "auto" picks uvloop + httptools when uvicorn[standard] is installed,
+        # falling back to asyncio + h11 otherwise; lifespan runs per worker
+        uvicorn.run(
+            "src.api.main:app",
+            host=settings.api_host,
+            port=settings.api_port,
+            loop="auto",
+            http="auto",
+            workers=max(2, os.cpu_count() or 1),
+        )
@@ -1,9 +1,10 @@
 """
 Configuration management using pydantic-settings.
 """
+from dataclasses import dataclass
 from pydantic_settings import BaseSettings
 from typing import Optional
-from functools import lru_cache
+from functools import cache
 
 
 class Settings(BaseSettings):
@@ -13,6 +14,7 @@ class Settings(BaseSettings):
     app_env: str = "development"
     api_port: int = 8000
     api_host: str = "0.0.0.0"
+    frontend_origin: str = "http://localhost:8000"
 
     # Supabase (Vector Store)
     supabase_url: str = ""
@@ -78,7 +80,36 @@ class Settings(BaseSettings):
         extra = "ignore"  # Ignore extra fields in .env
 
 
-@lru_cache()
+@dataclass(slots=True, frozen=True)
+class SettingsSnapshot:
+    """
+    Plain, immutable copy of the settings read on request hot paths.
+
+    Attribute access on a pydantic model goes through its own machinery;
+    a slots dataclass is a direct slot read. Derived values such as
+    secure_cookies are computed once here instead of per request.
+    """
+
+    app_env: str
+    secure_cookies: bool
+    similarity_threshold: float
+    max_rag_results: int
+    groq_model: str
+    groq_model_fast: str
+
+    @classmethod
+    def from_settings(cls, s: Settings) -> "SettingsSnapshot":
+        return cls(
+            app_env=s.app_env,
+            secure_cookies=s.app_env != "development",
+            similarity_threshold=s.similarity_threshold,
+            max_rag_results=s.max_rag_results,
+            groq_model=s.groq_model,
+            groq_model_fast=s.groq_model_fast,
+        )
+
+
+@cache
 def get_settings() -> Settings:
     """Get cached settings instance."""
     return Settings()
@@ -86,3 +117,4 @@ def get_settings() -> Settings:
 
 # Convenience access
 settings = get_settings()
+cfg = SettingsSnapshot.from_settings(settings)
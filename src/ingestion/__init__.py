@@ -1,8 +1,11 @@
-from .docx_extractor import DocxExtractor, ExtractedDocument, ExtractedSection
-from .text_chunker import TextChunker, Chunk
-from .embedding_generator import EmbeddingGenerator
-from .supabase_loader import SupabaseLoader
-from .pipeline import DocumentIngestionPipeline
+"""
+Document ingestion: DOCX extraction, chunking, embedding and loading.
+
+The names below resolve lazily through __getattr__, so importing one
+submodule (e.g. docx_extractor) does not load the Gemini and Supabase
+SDKs as a side effect.
+"""
+import importlib
 
 __all__ = [
     "DocxExtractor",
@@ -11,6 +14,34 @@ __all__ = [
     "TextChunker",
     "Chunk",
     "EmbeddingGenerator",
+    "quantize_embeddings",
     "SupabaseLoader",
     "DocumentIngestionPipeline",
 ]
+
+# Exported name -> submodule that defines it
+_EXPORTS = {
+    "DocxExtractor": "docx_extractor",
+    "ExtractedDocument": "docx_extractor",
+    "ExtractedSection": "docx_extractor",
+    "TextChunker": "text_chunker",
+    "Chunk": "text_chunker",
+    "EmbeddingGenerator": "embedding_generator",
+    "quantize_embeddings": "embedding_generator",
+    "SupabaseLoader": "supabase_loader",
+    "DocumentIngestionPipeline": "pipeline",
+}
+
+
+def __getattr__(name: str):
+    # PEP 562 hook: import the defining submodule on first access
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted((*globals(), *__all__))
@@ -0,0 +1,100 @@
+"""
+Embeddings of chapter metadata (title, description, topics).
+
+Vectors are computed from each chapter's precomputed search_text. Rows
+found in the shipped sidecar files (chapter_embeddings.npy, float16, plus
+chapter_embeddings.json, one text hash per row) are memory-mapped instead
+of embedded; write them with scripts/precompute_chapter_embeddings.py.
+Anything missing goes through EmbeddingGenerator.generate_batch, which,
+with a cache_dir, persists vectors in its SQLite cache. Both stores key on
+a hash of the text, so editing a chapter's metadata re-embeds only that
+chapter.
+"""
+from pathlib import Path
+from typing import Dict, Optional, Tuple
+import functools
+import hashlib
+import json
+
+import numpy as np
+
+from .embedding_generator import EmbeddingGenerator, quantize_embeddings
+from .subject_metadata import CLASS_LEVELS, SUBJECT_METADATA, SUBJECTS
+
+PRECOMPUTED_NPY = Path(__file__).with_name("chapter_embeddings.npy")
+PRECOMPUTED_KEYS = Path(__file__).with_name("chapter_embeddings.json")
+
+
+def _text_key(embedder: EmbeddingGenerator, text: str) -> str:
+    return hashlib.blake2b(f"{embedder.model_name}|{text}".encode(), digest_size=16).hexdigest()
+
+
+@functools.cache
+def _precomputed() -> Tuple[Dict[str, int], Optional[np.ndarray]]:
+    """Row index and memory-mapped matrix of the sidecar files, if shipped."""
+    try:
+        keys = json.loads(PRECOMPUTED_KEYS.read_bytes())
+        matrix = np.load(PRECOMPUTED_NPY, mmap_mode="r")
+    except FileNotFoundError:
+        return {}, None
+    return {k: i for i, k in enumerate(keys)}, matrix
+
+
+@functools.lru_cache(maxsize=32)
+def chapter_embedding_matrix(
+    embedder: EmbeddingGenerator, class_level: int, subject: str
+) -> Tuple[Tuple[int, ...], np.ndarray]:
+    """
+    Embed every chapter of one class/subject.
+
+    Returns (chapter_numbers, matrix), where row i of the (N, 768) float32
+    matrix belongs to chapter_numbers[i]. Rows are unit vectors, so a
+    matrix @ query product gives cosine similarities. Memoized per
+    embedder, so each process embeds (or reads from disk) only once.
+    """
+    chapters = SUBJECT_METADATA.get(class_level, {}).get(subject, {})
+    numbers = tuple(chapters)
+    matrix = np.empty((len(numbers), embedder.dimension), dtype=np.float32)
+
+    index, stored = _precomputed()
+    missing = []
+    for i, n in enumerate(numbers):
+        row = index.get(_text_key(embedder, chapters[n].search_text))
+        if row is None:
+            missing.append(i)
+        else:
+            matrix[i] = stored[row]
+    if missing:
+        matrix[missing] = embedder.generate_batch(
+            [chapters[numbers[i]].search_text for i in missing]
+        )
+
+    matrix.setflags(write=False)  # shared between callers via the cache
+    return numbers, matrix
+
+
+def get_chapter_embedding(
+    embedder: EmbeddingGenerator, class_level: int, subject: str, chapter_number: int
+) -> Optional[np.ndarray]:
+    """Embedding of one chapter's metadata, or None if the chapter is not listed."""
+    numbers, matrix = chapter_embedding_matrix(embedder, class_level, subject)
+    try:
+        return matrix[numbers.index(chapter_number)]
+    except ValueError:
+        return None
+
+
+def save_precomputed(embedder: EmbeddingGenerator) -> int:
+    """Embed every chapter of every subject and write the sidecar files; returns the row count."""
+    texts = [
+        meta.search_text
+        for class_level in CLASS_LEVELS
+        for subject in SUBJECTS
+        for meta in SUBJECT_METADATA[class_level][subject].values()
+    ]
+    embeddings = embedder.generate_batch(texts)
+    np.save(PRECOMPUTED_NPY, quantize_embeddings(embeddings, "float16"))
+    PRECOMPUTED_KEYS.write_text(json.dumps([_text_key(embedder, t) for t in texts]) + "\n")
+    _precomputed.cache_clear()
+    chapter_embedding_matrix.cache_clear()
+    return len(texts)
@@ -4,8 +4,26 @@ DOCX text extraction with structure preservation.
 from dataclasses import dataclass
 from typing import List
 from pathlib import Path
+import io
 import re
 
+_HEADING_NUM_RE = re.compile(r"^\d+\.?\d*\s+")
+_HEADING_LEVEL_RE = re.compile(r"Heading\s*(\d+)")
+_CHAPTER_RE = re.compile(r"Chapter\s+(\d+)", re.IGNORECASE)
+# One alternation, so each paragraph is scanned once for every kind of formula
+_FORMULA_RE = re.compile(
+    r"[A-Za-z]\s*=\s*[A-Za-z0-9*/+\-^]+"  # F = ma
+    r"|\d+\s*x\s*\d+"  # multiplication
+    r"|[²³√×∑∫]"  # Unicode math symbols (superscripts, roots, operators)
+)
+
+# WordprocessingML tag names, for walking the document body with lxml
+_W_NS = "{http://schemas.openxmlformats.org/wordprocessingml/2006/main}"
+_W_P = _W_NS + "p"
+_W_TBL = _W_NS + "tbl"
+_W_TR = _W_NS + "tr"
+_W_TC = _W_NS + "tc"
+
 
 @dataclass
 class ExtractedSection:
@@ -16,6 +34,7 @@ class ExtractedSection:
     level: int  # Heading level (1, 2, 3, etc.)
     has_formula: bool
     has_table: bool
+    has_diagram: bool = False  # set by LatexExtractor for tikz figures
 
 
 @dataclass
@@ -25,9 +44,17 @@ class ExtractedDocument:
     filename: str
     chapter_number: int
     sections: List[ExtractedSection]
-    full_text: str
     metadata: dict
 
+    @property
+    def full_text(self) -> str:
+        """
+        All section content, joined on demand.
+
+        Not stored: the sections already hold the only copy of the text.
+        """
+        return "\n\n".join(s.content for s in self.sections)
+
 
 class DocxExtractor:
     """
@@ -57,14 +84,50 @@ class DocxExtractor:
         # Extract chapter number from filename
         chapter_num = self._extract_chapter_number(file_path.name)
 
+        # Resolve style ids to names once, instead of a style lookup per paragraph
+        style_names = {s.style_id: s.name or "" for s in doc.styles}
+
         sections = []
         current_section_title = "Introduction"
-        current_section_content = []
+        current_section_content = io.StringIO()  # reused for every section
+        current_has_formula = False
         current_level = 1
 
-        for para in doc.paragraphs:
-            style_name = para.style.name if para.style else ""
-            text = para.text.strip()
+        # One pass over the body in document order; tables land in the
+        # section they appear in rather than being appended at the end
+        for child in doc.element.body.iterchildren(_W_P, _W_TBL):
+            if child.tag == _W_TBL:
+                table_text = self._table_to_text(child)
+                if not table_text:
+                    continue
+                # Close the text before the table; later paragraphs continue
+                # under the same heading
+                if current_section_content.tell():
+                    sections.append(
+                        ExtractedSection(
+                            title=current_section_title,
+                            content=current_section_content.getvalue(),
+                            level=current_level,
+                            has_formula=current_has_formula,
+                            has_table=False,
+                        )
+                    )
+                    current_section_content.seek(0)
+                    current_section_content.truncate()
+                    current_has_formula = False
+                sections.append(
+                    ExtractedSection(
+                        title="Table",
+                        content=table_text,
+                        level=3,
+                        has_formula=False,
+                        has_table=True,
+                    )
+                )
+                continue
+
+            style_name = style_names.get(child.style, "")
+            text = child.text.strip()
 
             if not text:
                 continue
@@ -72,100 +135,87 @@ class DocxExtractor:
             # Check if this is a heading
             if "Heading" in style_name or self._is_heading(text):
                 # Save previous section
-                if current_section_content:
-                    content = "\n".join(current_section_content)
+                if current_section_content.tell():
                     sections.append(
                         ExtractedSection(
                             title=current_section_title,
-                            content=content,
+                            content=current_section_content.getvalue(),
                             level=current_level,
-                            has_formula=self._has_formula(content),
+                            has_formula=current_has_formula,
                             has_table=False,
                         )
                     )
 
                 # Start new section
                 current_section_title = text
-                current_section_content = []
+                current_section_content.seek(0)
+                current_section_content.truncate()
+                current_has_formula = False
                 current_level = self._get_heading_level(style_name)
             else:
-                current_section_content.append(text)
+                if current_section_content.tell():
+                    current_section_content.write("\n")
+                current_section_content.write(text)
+                # Check paragraphs as they arrive; stop once one has a formula
+                if not current_has_formula:
+                    current_has_formula = self._has_formula(text)
 
         # Don't forget the last section
-        if current_section_content:
-            content = "\n".join(current_section_content)
+        if current_section_content.tell():
             sections.append(
                 ExtractedSection(
                     title=current_section_title,
-                    content=content,
+                    content=current_section_content.getvalue(),
                     level=current_level,
-                    has_formula=self._has_formula(content),
+                    has_formula=current_has_formula,
                     has_table=False,
                 )
             )
 
-        # Extract tables
-        for table in doc.tables:
-            table_text = self._table_to_text(table)
-            if table_text:
-                sections.append(
-                    ExtractedSection(
-                        title="Table",
-                        content=table_text,
-                        level=3,
-                        has_formula=False,
-                        has_table=True,
-                    )
-                )
-
-        full_text = "\n\n".join([s.content for s in sections])
-
         return ExtractedDocument(
             filename=file_path.name,
             chapter_number=chapter_num,
             sections=sections,
-            full_text=full_text,
             metadata={
                 "total_sections": len(sections),
                 "has_tables": any(s.has_table for s in sections),
                 "has_formulas": any(s.has_formula for s in sections),
-                "word_count": len(full_text.split()),
+                "word_count": sum(len(s.content.split()) for s in sections),
             },
         )
 
     def _extract_chapter_number(self, filename: str) -> int:
         """Extract chapter number from filename like 'Chapter 1 - Notes (Final 1).docx'"""
-        match = re.search(r"Chapter\s+(\d+)", filename, re.IGNORECASE)
+        match = _CHAPTER_RE.search(filename)
         return int(match.group(1)) if match else 0
 
     def _is_heading(self, text: str) -> bool:
         """Heuristic to detect headings in text."""
-        # Short text, all caps, or numbered section
-        if len(text) < 100 and (
-            text.isupper() or re.match(r"^\d+\.?\d*\s+", text)
-        ):
+        # Short text, all caps, or numbered section. Cheap checks first:
+        # the regex only runs for paragraphs that start with a digit.
+        if len(text) >= 100:
+            return False
+        if text[0].isdigit() and _HEADING_NUM_RE.match(text):
             return True
-        return False
+        return text.isupper()
 
     def _get_heading_level(self, style_name: str) -> int:
         """Extract heading level from style name."""
-        match = re.search(r"Heading\s*(\d+)", style_name)
+        match = _HEADING_LEVEL_RE.search(style_name)
         return int(match.group(1)) if match else 1
 
     def _has_formula(self, text: str) -> bool:
         """Check if text contains formulas."""
-        formula_patterns = [
-            r"[A-Za-z]\s*=\s*[A-Za-z0-9\*/\+\-\^]+",  # F = ma
-            r"\d+\s*[x]\s*\d+",  # multiplication
-            r"[^a-zA-Z0-9]",  # superscripts (Unicode)
-        ]
-        return any(re.search(p, text) for p in formula_patterns)
-
-    def _table_to_text(self, table) -> str:
-        """Convert a table to readable text format."""
+        return _FORMULA_RE.search(text) is not None
+
+    def _table_to_text(self, tbl) -> str:
+        """Convert a table (<w:tbl> element) to readable text format."""
         rows = []
-        for row in table.rows:
-            cells = [cell.text.strip() for cell in row.cells]
+        for tr in tbl.iterchildren(_W_TR):
+            cells = [
+                "\n".join(p.text for p in tc.iterchildren(_W_P)).strip()
+                for tc in tr.iterchildren(_W_TC)
+            ]
             if any(cells):  # Skip empty rows
                 rows.append(" | ".join(cells))
         return "\n".join(rows)
@@ -1,15 +1,86 @@
 """
 Generate embeddings using Gemini API with automatic key rotation.
 """
-from typing import List
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+import functools
+import hashlib
+import itertools
 import os
+import re
+import sqlite3
+import threading
 import time
 import logging
 
+import numpy as np
+
+try:
+    import google.genai as genai
+except ImportError:  # checked in EmbeddingGenerator.__init__
+    genai = None
+
 from ..services.key_rotator import KeyRotator
+from ..services.rate_limiter import TokenBucket
 
 logger = logging.getLogger(__name__)
 
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def quantize_embeddings(embeddings, dtype: str = "float16") -> np.ndarray:
+    """
+    Cast embeddings to a compact storage type.
+
+    - "float16": matches pgvector's halfvec(768) column (2x smaller)
+    - "int8": L2-normalized then scaled to [-127, 127] (4x smaller); cosine
+      is scale-invariant, so ranking is preserved up to rounding
+    """
+    arr = np.asarray(embeddings, dtype=np.float32)
+    if dtype == "float16":
+        return arr.astype(np.float16)
+    if dtype == "int8":
+        norms = np.linalg.norm(arr, axis=-1, keepdims=True)
+        arr = arr / np.maximum(norms, 1e-12)
+        return np.clip(np.rint(arr * 127), -128, 127).astype(np.int8)
+    raise ValueError(f"Unsupported embedding dtype: {dtype}")
+
+
+class _EmbeddingCache:
+    """
+    SQLite-backed key/value store for embeddings, keyed by a content hash.
+
+    Lets re-runs of ingestion skip texts that were already embedded.
+    """
+
+    def __init__(self, cache_dir: str):
+        path = Path(cache_dir)
+        path.mkdir(parents=True, exist_ok=True)
+        self._conn = sqlite3.connect(path / "embeddings.sqlite3", check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS embeddings (key BLOB PRIMARY KEY, value BLOB NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def get_many(self, keys: List[bytes]) -> Dict[bytes, bytes]:
+        found = {}
+        with self._lock:
+            for i in range(0, len(keys), 500):  # stay under SQLite's variable limit
+                part = keys[i:i + 500]
+                rows = self._conn.execute(
+                    f"SELECT key, value FROM embeddings WHERE key IN ({','.join('?' * len(part))})",
+                    part,
+                )
+                found.update(rows)
+        return found
+
+    def set_many(self, items: Iterable[Tuple[bytes, bytes]]):
+        with self._lock, self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, value) VALUES (?, ?)", items
+            )
+
 
 class EmbeddingGenerator:
     """
@@ -21,6 +92,9 @@ class EmbeddingGenerator:
     - Free tier available
 
     Supports multiple API keys with automatic rotation on 429.
+
+    All returned embeddings are L2-normalized (unit vectors), so cosine
+    similarity between them is a plain dot product.
     """
 
     def __init__(
@@ -28,6 +102,9 @@ class EmbeddingGenerator:
         model_name: str = "gemini",
         api_key: str = None,
         api_keys: list[str] = None,
+        cache_dir: str = None,
+        prewarm: bool = False,
+        requests_per_minute: int = 40,
     ):
         # Build key list: explicit list > single key > env vars
         keys = api_keys or []
@@ -44,44 +121,98 @@ class EmbeddingGenerator:
 
         if not keys:
             raise ValueError("At least one Gemini API key is required for embeddings")
+        if genai is None:
+            raise ImportError("google-genai is required for embeddings: pip install google-genai")
 
         self._rotator = KeyRotator(keys, name="Gemini")
-        self._gemini_clients: dict[str, object] = {}
+        # Per-key request budget for batch embedding (~40 RPM is safe for free
+        # tier), indexed like the rotator's keys
+        self._buckets = [TokenBucket(requests_per_minute, per=60.0) for _ in keys]
         self.model_name = "models/gemini-embedding-001"
 
+        # Optional on-disk cache of document embeddings (used by ingestion)
+        self._cache = _EmbeddingCache(cache_dir) if cache_dir else None
+
+        # Per-instance LRU of query embeddings, so the cache neither pins the
+        # generator nor shares its slots with other instances
+        self._embed_cached = functools.lru_cache(maxsize=2048)(self._embed_query)
+
+        # Long-running processes can build every client up front
+        if prewarm:
+            for index in range(len(keys)):
+                self._rotator.client_at(index, self._new_client)
+
     @property
     def dimension(self) -> int:
         """Return embedding dimension."""
         return 768
 
-    def _get_client(self, key: str):
-        """Lazy-load a Gemini client for the given key."""
-        if key not in self._gemini_clients:
-            import google.genai as genai
-            self._gemini_clients[key] = genai.Client(api_key=key)
-        return self._gemini_clients[key]
+    @staticmethod
+    def _new_client(key: str):
+        """Gemini client for one key; the rotator caches one per key."""
+        return genai.Client(api_key=key)
 
-    def _gemini_embed(self, text: str, task_type: str, max_retries: int = 8):
-        """Call Gemini embed_content with key rotation + exponential backoff on 429."""
+    def warm_up(self) -> None:
+        """
+        Open the current key's connection with one models.get call, which
+        uses no embedding quota and skips the 429 retry loop.
+        """
+        client = self._rotator.client_at(self._rotator.current_index, self._new_client)
+        client.models.get(model=self.model_name)
+
+    def _gemini_embed(self, text: str, task_type: str, max_retries: int = 8) -> np.ndarray:
+        """Embed a single text."""
+        return self._gemini_embed_batch([text], task_type, max_retries)[0]
+
+    def _gemini_embed_batch(
+        self,
+        texts: List[str],
+        task_type: str,
+        max_retries: int = 8,
+        throttle: bool = False,
+        start_index: Optional[int] = None,
+    ) -> np.ndarray:
+        """
+        Embed up to 100 texts in one embed_content call, with key rotation +
+        exponential backoff on 429. With throttle=True each request first
+        takes a token from the bucket of the key it is sent on.
+
+        By default the call starts on the rotator's current key and a 429
+        advances the shared rotator. With start_index it starts on that key
+        and a 429 moves only this call on to the next key, so parallel
+        batches each keep to their own key.
+        """
         keys_tried = 0
         total_keys = self._rotator.key_count
+        index = self._rotator.current_index if start_index is None else start_index
+        client = self._rotator.client_at(index, self._new_client)
 
         for attempt in range(max_retries):
-            client = self._get_client(self._rotator.current_key)
+            if throttle:
+                self._buckets[index].acquire()
             try:
                 result = client.models.embed_content(
                     model=self.model_name,
-                    contents=text,
+                    contents=texts,
                     config={
                         "task_type": task_type,
                         "output_dimensionality": 768,
                     },
                 )
-                return result.embeddings[0].values
+                out = np.empty((len(texts), self.dimension), dtype=np.float32)
+                for i, e in enumerate(result.embeddings):
+                    out[i] = e.values
+                # Truncated (768-d) Gemini embeddings are not unit-length
+                out /= np.linalg.norm(out, axis=1, keepdims=True) + 1e-12
+                return out
             except Exception as e:
                 if "429" in str(e) or "RESOURCE_EXHAUSTED" in str(e):
                     keys_tried += 1
-                    self._rotator.next()
+                    if start_index is None:
+                        index, client = self._rotator.next_client(self._new_client)
+                    else:
+                        index = (index + 1) % total_keys
+                        client = self._rotator.client_at(index, self._new_client)
 
                     if keys_tried >= total_keys:
                         # All keys hit — backoff before next round
@@ -97,25 +228,116 @@ class EmbeddingGenerator:
                     raise
         raise RuntimeError(f"Failed after {max_retries} retries due to rate limiting")
 
-    def generate(self, text: str) -> List[float]:
+    def _cache_key(self, text: str, task_type: str) -> bytes:
+        """Content hash; includes task type, model and dimension."""
+        return hashlib.blake2b(
+            f"{task_type}|{self.model_name}|{self.dimension}|{text}".encode(),
+            digest_size=16,
+        ).digest()
+
+    def _with_disk_cache(
+        self,
+        texts: List[str],
+        task_type: str,
+        embed_missing: Callable[[List[str]], np.ndarray],
+    ) -> np.ndarray:
+        """Serve texts from the disk cache; embed (and store) only the misses."""
+        if self._cache is None:
+            return embed_missing(texts)
+
+        keys = [self._cache_key(t, task_type) for t in texts]
+        hits = self._cache.get_many(keys)
+
+        out = np.empty((len(texts), self.dimension), dtype=np.float32)
+        missing = []
+        for i, key in enumerate(keys):
+            value = hits.get(key)
+            if value is None:
+                missing.append(i)
+            else:
+                out[i] = np.frombuffer(value, dtype=np.float32)
+
+        if hits:
+            print(f"  {len(texts) - len(missing)}/{len(texts)} embeddings served from cache")
+
+        if missing:
+            embedded = embed_missing([texts[i] for i in missing])
+            out[missing] = embedded
+            self._cache.set_many(
+                (keys[i], embedded[j].tobytes()) for j, i in enumerate(missing)
+            )
+        return out
+
+    def generate(self, text: str) -> np.ndarray:
         """Generate embedding for a single text."""
-        return self._gemini_embed(text, "RETRIEVAL_DOCUMENT")
+        return self._with_disk_cache(
+            [text],
+            "RETRIEVAL_DOCUMENT",
+            lambda texts: self._gemini_embed_batch(texts, "RETRIEVAL_DOCUMENT"),
+        )[0]
 
     def generate_batch(
         self, texts: List[str], batch_size: int = 100
-    ) -> List[List[float]]:
-        """Generate embeddings for multiple texts."""
-        embeddings = []
-        total_batches = (len(texts) - 1) // batch_size + 1
-        for i in range(0, len(texts), batch_size):
-            batch = texts[i:i + batch_size]
-            print(f"  Embedding batch {i//batch_size + 1}/{total_batches}...")
-            for text in batch:
-                emb = self._gemini_embed(text, "RETRIEVAL_DOCUMENT")
-                embeddings.append(emb)
-                time.sleep(1.5)  # ~40 RPM, safe for free tier
-        return embeddings
-
-    def generate_query(self, text: str) -> List[float]:
-        """Generate embedding for a query (uses retrieval_query task type)."""
-        return self._gemini_embed(text, "RETRIEVAL_QUERY")
+    ) -> np.ndarray:
+        """
+        Generate embeddings for multiple texts.
+
+        Each batch of up to batch_size texts (100 is the API maximum) is one
+        embed_content request. Batches run on one worker thread per API key,
+        batch i starting on key i % key_count, so throughput scales with the
+        number of keys. Results keep the input
+        order, as rows of a (len(texts), 768) float32 array. With a cache_dir,
+        texts embedded on a previous run are read from disk instead.
+
+        Repeated texts (shared headers, captions) are embedded only once.
+        """
+        unique: Dict[str, int] = {}
+        order = [unique.setdefault(t, len(unique)) for t in texts]
+
+        embeddings = self._with_disk_cache(
+            list(unique),
+            "RETRIEVAL_DOCUMENT",
+            functools.partial(self._embed_parallel, batch_size=batch_size),
+        )
+        if len(unique) == len(texts):
+            return embeddings
+        print(f"  {len(texts) - len(unique)} duplicate texts reused")
+        return embeddings[order]
+
+    def _embed_parallel(self, texts: List[str], batch_size: int) -> np.ndarray:
+        """Embed texts in API-sized batches on one worker thread per key."""
+        out = np.empty((len(texts), self.dimension), dtype=np.float32)
+        batches = [texts[i:i + batch_size] for i in range(0, len(texts), batch_size)]
+        key_count = self._rotator.key_count
+        with ThreadPoolExecutor(max_workers=key_count) as executor:
+            for n, batch_embeddings in enumerate(
+                executor.map(
+                    self._embed_document_batch, batches, itertools.cycle(range(key_count))
+                )
+            ):
+                print(f"  Embedded batch {n + 1}/{len(batches)}")
+                start = n * batch_size
+                out[start:start + len(batch_embeddings)] = batch_embeddings
+        return out
+
+    def _embed_document_batch(self, batch: List[str], key_index: int) -> np.ndarray:
+        """Embed one batch of documents on its assigned key, within that key's rate limit."""
+        return self._gemini_embed_batch(
+            batch, "RETRIEVAL_DOCUMENT", throttle=True, start_index=key_index
+        )
+
+    def _embed_query(self, norm_query: str) -> np.ndarray:
+        """Embed a normalized query; memoized per instance as _embed_cached."""
+        emb = self._gemini_embed(norm_query, "RETRIEVAL_QUERY")
+        emb.setflags(write=False)  # shared between callers via the cache
+        return emb
+
+    def generate_query(self, text: str) -> np.ndarray:
+        """
+        Generate embedding for a query (uses retrieval_query task type).
+
+        Queries are lowercased and whitespace-collapsed before embedding, so
+        identical and near-identical questions hit the in-process LRU cache.
+        """
+        norm_query = _WHITESPACE_RE.sub(" ", text.strip().lower())
+        return self._embed_cached(norm_query)
@@ -12,6 +12,85 @@ from typing import List
 
 from .docx_extractor import ExtractedDocument, ExtractedSection
 
+try:
+    import re2
+except ImportError:
+    re2 = None
+
+# Use RE2 (linear-time) for the whole-document environment patterns when
+# google-re2 is installed. With sre, an unclosed \begin{QAPair} makes the
+# lazy groups backtrack polynomially (minutes on a ~40 KB file); RE2 takes
+# under a millisecond. Patterns compiled with _re must avoid lookarounds and
+# backreferences and use inline flags, so they work on either engine. The
+# per-section patterns stay on re, where the binding overhead would dominate.
+_re = re2 or re
+
+_CHAPTER_RE = re.compile(r"(?i)Chapter\s+(\d+)")
+_PAREN_RE = re.compile(r"\((.*?)\)")
+_CENTER_TITLE_RE = _re.compile(r"(?is)\\begin\{center\}.*?\{(Exercise[^}]*)\}")
+_CMD_WITH_ARG_RE = re.compile(r"\\[a-zA-Z]+\{[^}]*\}")
+_CMD_RE = re.compile(r"\\[a-zA-Z]+")
+_QAPAIR_RE = _re.compile(r"(?s)\\begin\{QAPair\}\{(.*?)\}(.*?)\\end\{QAPair\}")
+# Inline $...$ (on one line), display \[...\], or common math commands
+_MATH_RE = re.compile(
+    r"\$[^\n$]*\$"
+    r"|\\(?:(?s:\[.*?\\\])|frac\b|boxed\b|sqrt\b|begin\{aligned\})"
+)
+
+# Commands removed by LatexExtractor._clean_latex, as (trigger, pattern,
+# replacement) in the order they run; a pass is skipped unless its literal
+# trigger occurs in the text. The order matters: the [^}]* arguments of
+# \textbf/\emph would swallow a nested command's opening brace
+# (\textbf{\color{red}x}), so inner color commands go first.
+_CLEAN_PASSES = (
+    # Replace \tcblower with solution separator
+    ("\\tcblower", re.compile(r"\\tcblower"), "\n--- SOLUTION ---\n"),
+    # Replace \Step{N} with readable text
+    ("\\Step{", re.compile(r"\\Step\{(\d+)\}"), r"Step \1:"),
+    # Remove tikzpicture environments
+    (
+        "\\begin{tikzpicture}",
+        re.compile(r"(?s)\\begin\{tikzpicture\}.*?\\end\{tikzpicture\}"),
+        "[Diagram]",
+    ),
+    # Remove color/font commands (preserve their content)
+    ("\\textcolor{", re.compile(r"\\textcolor\{[^}]*\}\{([^}]*)\}"), r"\1"),
+    ("\\color{", re.compile(r"\\color\{[^}]*\}"), ""),
+    ("\\textbf{", re.compile(r"\\textbf\{([^}]*)\}"), r"\1"),
+    ("\\emph{", re.compile(r"\\emph\{([^}]*)\}"), r"\1"),
+    # Remove spacing commands and \bfseries
+    ("\\", re.compile(r"\\(?:par|medskip|bigskip|smallskip|noindent|bfseries)\b"), ""),
+    # Line breaks (\\), with or without [Npt] spacing
+    ("\\\\", re.compile(r"\\\\(?:\[[\d.]*pt\])?"), "\n"),
+    # Remove \begin{itemize/enumerate} ... \end{} but keep \item text
+    (
+        "\\",
+        re.compile(
+            r"\\begin\{(?:itemize|enumerate)\}(?:\[[^\]]*\])?|\\end\{(?:itemize|enumerate)\}"
+        ),
+        "",
+    ),
+    ("\\item", re.compile(r"\\item\b"), "- "),
+    # Remove \href but keep text; before the stray-brace pass, which would
+    # otherwise unwrap the text argument and leave \href{url}text behind
+    ("\\href{", re.compile(r"\\href\{[^}]*\}\{([^}]*)\}"), r"\1"),
+)
+# Run after the stray-brace pass, so {\large x} keeps its braces as before:
+# \begin{center}/\end{center}, font-size and page-break commands
+_CLEAN_LATE_RE = re.compile(
+    r"\\(?:begin\{center\}|end\{center\}"
+    r"|(?:LARGE|Large|large|normalsize|small|footnotesize|tiny"
+    r"|hfill|vfill|clearpage|newpage|pagebreak)\b)"
+)
+
+# Stray braces left after command removal (e.g. {\bfseries text}). Only braces
+# NOT preceded by a backslash or letter (preserves \text{}, \boxed{}, etc.).
+# The lookbehind sits after the literal "{" so the engine can jump between braces.
+_STRAY_BRACES_RE = re.compile(r"\{(?<![\\a-zA-Z]\{)([^{}$]*?)\}")
+# Stray % comments (but not inside math)
+_COMMENT_RE = re.compile(r"(?m)^%.*$")
+_BLANK_LINES_RE = re.compile(r"\n{3,}")
+
 
 class LatexExtractor:
     """
@@ -27,13 +106,11 @@ class LatexExtractor:
     # ------------------------------------------------------------------
 
     def extract(self, file_path: Path) -> ExtractedDocument:
-        raw = file_path.read_text(encoding="utf-8")
+        # Isolate document body; only that slice is decoded
+        body = self._get_body(file_path.read_bytes())
 
         chapter_num = self._extract_chapter_number(file_path.name)
-        exercise_title = self._extract_exercise_title(raw, file_path.name)
-
-        # Isolate document body
-        body = self._get_body(raw)
+        exercise_title = self._extract_exercise_title(body, file_path.name)
 
         sections: List[ExtractedSection] = []
 
@@ -48,6 +125,7 @@ class LatexExtractor:
                         level=1,
                         has_formula=True,
                         has_table=False,
+                        has_diagram="[Diagram]" in cleaned,
                     )
                 )
 
@@ -62,21 +140,19 @@ class LatexExtractor:
                         level=2,
                         has_formula=self._has_math(cleaned),
                         has_table=False,
+                        has_diagram="[Diagram]" in cleaned,
                     )
                 )
 
-        full_text = "\n\n".join(s.content for s in sections)
-
         return ExtractedDocument(
             filename=file_path.name,
             chapter_number=chapter_num,
             sections=sections,
-            full_text=full_text,
             metadata={
                 "total_sections": len(sections),
                 "has_tables": False,
                 "has_formulas": any(s.has_formula for s in sections),
-                "word_count": len(full_text.split()),
+                "word_count": sum(len(s.content.split()) for s in sections),
                 "exercise_title": exercise_title,
             },
         )
@@ -86,37 +162,36 @@ class LatexExtractor:
     # ------------------------------------------------------------------
 
     @staticmethod
-    def _get_body(raw: str) -> str:
-        """Return text between \\begin{document} and \\end{document}."""
-        m = re.search(
-            r"\\begin\{document\}(.*?)\\end\{document\}",
-            raw,
-            re.DOTALL,
-        )
-        return m.group(1) if m else raw
+    def _get_body(raw: bytes) -> str:
+        """Decode the text between \\begin{document} and \\end{document}."""
+        start = raw.find(b"\\begin{document}")
+        end = raw.find(b"\\end{document}", start) if start != -1 else -1
+        if end != -1:
+            raw = raw[start + len(b"\\begin{document}"):end]
+        text = raw.decode("utf-8")
+        # Match read_text()'s universal-newline handling
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
 
     @staticmethod
     def _extract_chapter_number(filename: str) -> int:
-        m = re.search(r"Chapter\s+(\d+)", filename, re.IGNORECASE)
+        m = _CHAPTER_RE.search(filename)
         return int(m.group(1)) if m else 0
 
     @staticmethod
     def _extract_exercise_title(raw: str, filename: str) -> str:
         """Derive exercise title from the filename (most reliable)."""
         # Try filename first: "Class 9 Math - Chapter 4 (Exercise 4.5).tex"
-        m = re.search(r"\((.*?)\)", filename)
+        m = _PAREN_RE.search(filename)
         if m:
             return m.group(1)
 
         # Fallback: try the \begin{center} heading
-        m2 = re.search(
-            r"\\begin\{center\}.*?\{(Exercise[^}]*)\}",
-            raw,
-            re.DOTALL | re.IGNORECASE,
-        )
+        m2 = _CENTER_TITLE_RE.search(raw)
         if m2:
-            title = re.sub(r"\\[a-zA-Z]+\{[^}]*\}", "", m2.group(1))
-            title = re.sub(r"\\[a-zA-Z]+", "", title).strip().strip("{}")
+            title = _CMD_WITH_ARG_RE.sub("", m2.group(1))
+            title = _CMD_RE.sub("", title).strip().strip("{}")
             if title:
                 return title
 
@@ -127,88 +202,59 @@ class LatexExtractor:
     @staticmethod
     def _extract_environments(body: str, env_name: str) -> List[str]:
         """Extract all occurrences of \\begin{env}...\\end{env}."""
-        pattern = re.compile(
-            rf"\\begin\{{{env_name}\}}(.*?)\\end\{{{env_name}\}}",
-            re.DOTALL,
-        )
-        return [m.group(1) for m in pattern.finditer(body)]
+        # Fixed delimiters: str.find is linear and skips the regex engine
+        start_tag, end_tag = f"\\begin{{{env_name}}}", f"\\end{{{env_name}}}"
+        out = []
+        i = 0
+        while True:
+            a = body.find(start_tag, i)
+            if a == -1:
+                break
+            a += len(start_tag)
+            b = body.find(end_tag, a)
+            if b == -1:
+                break
+            out.append(body[a:b])
+            i = b + len(end_tag)
+        return out
 
     @staticmethod
     def _extract_qapairs(body: str) -> List[tuple]:
         """Return list of (title, content) for every QAPair."""
-        pattern = re.compile(
-            r"\\begin\{QAPair\}\{(.*?)\}(.*?)\\end\{QAPair\}",
-            re.DOTALL,
-        )
-        return [(m.group(1).strip(), m.group(2).strip()) for m in pattern.finditer(body)]
+        return [(m.group(1).strip(), m.group(2).strip()) for m in _QAPAIR_RE.finditer(body)]
 
     # ---- LaTeX cleaning ----
 
     def _clean_latex(self, text: str) -> str:
-        """Strip decorative LaTeX while preserving math notation."""
-
-        # Replace \tcblower with solution separator
-        text = re.sub(r"\\tcblower", "\n--- SOLUTION ---\n", text)
-
-        # Replace \Step{N} with readable text
-        text = re.sub(r"\\Step\{(\d+)\}", r"Step \1:", text)
-
-        # Remove tikzpicture environments
-        text = re.sub(
-            r"\\begin\{tikzpicture\}.*?\\end\{tikzpicture\}",
-            "[Diagram]",
-            text,
-            flags=re.DOTALL,
-        )
-
-        # Remove color/font commands (preserve their content)
-        # Handle nested \textcolor{color}{content}
-        text = re.sub(r"\\textcolor\{[^}]*\}\{([^}]*)\}", r"\1", text)
-        text = re.sub(r"\\color\{[^}]*\}", "", text)
-        text = re.sub(r"\\textbf\{([^}]*)\}", r"\1", text)
-        text = re.sub(r"\\bfseries\b", "", text)
-        text = re.sub(r"\\emph\{([^}]*)\}", r"\1", text)
-
-        # Remove spacing commands
-        text = re.sub(r"\\(?:par|medskip|bigskip|smallskip|noindent)\b", "", text)
-        text = re.sub(r"\\\\\[[\d.]*pt\]", "\n", text)
-        text = re.sub(r"\\\\", "\n", text)
-
-        # Remove \begin{itemize/enumerate} ... \end{} but keep \item text
-        text = re.sub(r"\\begin\{(?:itemize|enumerate)\}(?:\[[^\]]*\])?", "", text)
-        text = re.sub(r"\\end\{(?:itemize|enumerate)\}", "", text)
-        text = re.sub(r"\\item\b", "- ", text)
-
-        # Remove stray braces left after command removal (e.g. {\bfseries text})
-        # Only remove braces NOT preceded by a backslash (preserves \text{}, \boxed{}, etc.)
-        text = re.sub(r"(?<!\\)(?<![a-zA-Z])\{([^{}$]*?)\}", r"\1", text)
-
-        # Remove \begin{center}/\end{center}
-        text = re.sub(r"\\begin\{center\}", "", text)
-        text = re.sub(r"\\end\{center\}", "", text)
-
-        # Remove font-size commands
-        text = re.sub(r"\\(?:LARGE|Large|large|normalsize|small|footnotesize|tiny)\b", "", text)
-
-        # Remove \href but keep text
-        text = re.sub(r"\\href\{[^}]*\}\{([^}]*)\}", r"\1", text)
-
-        # Remove remaining benign commands that have no argument
-        text = re.sub(r"\\(?:hfill|vfill|clearpage|newpage|pagebreak)\b", "", text)
-
-        # Remove stray % comments (but not inside math)
-        text = re.sub(r"(?m)^%.*$", "", text)
-
-        # Collapse excessive blank lines
-        text = re.sub(r"\n{3,}", "\n\n", text)
-
-        return text.strip()
+        r"""
+        Strip decorative LaTeX while preserving math notation.
+
+        Nested color/font commands keep their content:
+
+        >>> clean = LatexExtractor()._clean_latex
+        >>> clean(r"\textbf{\color{red}x}"), clean(r"\emph{\color{blue}Note}")
+        ('x', 'Note')
+        >>> clean(r"\textbf{\textcolor{red}{x}}"), clean(r"\textcolor{red}{\textbf{x}}")
+        ('x', 'x')
+        """
+        # Each pass only runs if its trigger string is present; plain
+        # prose answers (at most $...$ math) skip straight to the end.
+        for trigger, pattern, repl in _CLEAN_PASSES:
+            if trigger in text:
+                text = pattern.sub(repl, text)
+        if "{" in text:
+            text = _STRAY_BRACES_RE.sub(r"\1", text)
+        if "\\" in text:
+            text = _CLEAN_LATE_RE.sub("", text)
+        if "%" in text:
+            text = _COMMENT_RE.sub("", text)
+        # Strip first: the collapse then never touches leading/trailing runs
+        return _BLANK_LINES_RE.sub("\n\n", text.strip())
 
     @staticmethod
     def _has_math(text: str) -> bool:
         """Check whether text contains LaTeX math notation."""
-        return bool(
-            re.search(r"\$.*?\$", text)
-            or re.search(r"\\\[.*?\\\]", text, re.DOTALL)
-            or re.search(r"\\frac\b|\\boxed\b|\\sqrt\b|\\begin\{aligned\}", text)
-        )
+        # All math notation needs a "$" or a backslash
+        if "$" not in text and "\\" not in text:
+            return False
+        return _MATH_RE.search(text) is not None
@@ -46,11 +46,23 @@ class MathChunker:
             is_formula = section.title.startswith("Formula Summary")
             content_type = "formula_summary" if is_formula else "question_answer"
             word_count = len(section.content.split())
-            has_diagram = "[Diagram]" in section.content
 
             # Build the chunk text with context prefix
             chunk_header = f"{prefix} - {section.title}"
             full_text = f"{chunk_header}\n\n{section.content}"
+            # Word counts add up across the whitespace joining the parts, so
+            # count the short header once instead of re-splitting full_text
+            header_words = len(chunk_header.split())
+
+            # Fields shared by every chunk of this section
+            base_meta = {
+                "section_title": section.title,
+                "chapter_title": chapter_title,
+                "exercise_title": exercise_title,
+                "has_formula": section.has_formula,
+                "has_table": False,
+                "has_diagram": section.has_diagram,
+            }
 
             if word_count <= self.max_words or is_formula:
                 # Single chunk
@@ -59,14 +71,9 @@ class MathChunker:
                         text=full_text,
                         chunk_index=idx,
                         metadata={
-                            "section_title": section.title,
-                            "chapter_title": chapter_title,
-                            "exercise_title": exercise_title,
+                            **base_meta,
                             "content_type": content_type,
-                            "has_formula": section.has_formula,
-                            "has_table": False,
-                            "has_diagram": has_diagram,
-                            "word_count": len(full_text.split()),
+                            "word_count": header_words + word_count,
                         },
                     )
                 )
@@ -75,22 +82,18 @@ class MathChunker:
                 # Split at solution separator
                 parts = section.content.split("--- SOLUTION ---", 1)
                 if len(parts) == 2:
-                    q_text = f"{chunk_header} [Question]\n\n{parts[0].strip()}"
-                    s_text = f"{chunk_header} [Solution]\n\n{parts[1].strip()}"
+                    q_part, s_part = parts[0].strip(), parts[1].strip()
+                    q_text = f"{chunk_header} [Question]\n\n{q_part}"
+                    s_text = f"{chunk_header} [Solution]\n\n{s_part}"
 
                     chunks.append(
                         Chunk(
                             text=q_text,
                             chunk_index=idx,
                             metadata={
-                                "section_title": section.title,
-                                "chapter_title": chapter_title,
-                                "exercise_title": exercise_title,
+                                **base_meta,
                                 "content_type": "question",
-                                "has_formula": section.has_formula,
-                                "has_table": False,
-                                "has_diagram": has_diagram,
-                                "word_count": len(q_text.split()),
+                                "word_count": header_words + 1 + len(q_part.split()),
                             },
                         )
                     )
@@ -101,14 +104,9 @@ class MathChunker:
                             text=s_text,
                             chunk_index=idx,
                             metadata={
-                                "section_title": section.title,
-                                "chapter_title": chapter_title,
-                                "exercise_title": exercise_title,
+                                **base_meta,
                                 "content_type": "solution",
-                                "has_formula": section.has_formula,
-                                "has_table": False,
-                                "has_diagram": has_diagram,
-                                "word_count": len(s_text.split()),
+                                "word_count": header_words + 1 + len(s_part.split()),
                             },
                         )
                     )
@@ -120,14 +118,9 @@ class MathChunker:
                             text=full_text,
                             chunk_index=idx,
                             metadata={
-                                "section_title": section.title,
-                                "chapter_title": chapter_title,
-                                "exercise_title": exercise_title,
+                                **base_meta,
                                 "content_type": content_type,
-                                "has_formula": section.has_formula,
-                                "has_table": False,
-                                "has_diagram": has_diagram,
-                                "word_count": len(full_text.split()),
+                                "word_count": header_words + word_count,
                             },
                         )
                     )
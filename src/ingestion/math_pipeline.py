@@ -1,18 +1,55 @@
 """
 Orchestrate Math note ingestion:  .tex -> extract -> chunk -> embed -> Supabase.
 """
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Mapping, Tuple
+import itertools
 import logging
+import multiprocessing
+import os
 import re
 
+from .docx_extractor import ExtractedDocument
 from .latex_extractor import LatexExtractor
 from .math_chunker import MathChunker
+from .text_chunker import Chunk
 from .embedding_generator import EmbeddingGenerator
 from .supabase_loader import SupabaseLoader
 
 logger = logging.getLogger(__name__)
 
+# Chunks embedded per generate_batch call in process_directory; a few API
+# batches, so uploading one group overlaps with embedding the next
+EMBED_GROUP_SIZE = 400
+# Chunks embedded and uploaded together by process_file
+FILE_BATCH_SIZE = 64
+
+
+def _extract_and_chunk(
+    extractor: LatexExtractor,
+    chunker: MathChunker,
+    file_path: Path,
+    class_level: int,
+    chapter_metadata: Dict[int, Dict[str, Any]],
+) -> Tuple[ExtractedDocument, str, List[Chunk]]:
+    """
+    CPU-bound half of the pipeline: parse and chunk one .tex file.
+
+    Module-level (not a method) so it can run in a worker process; no
+    network clients are touched here.
+    """
+    doc = extractor.extract(file_path)
+    meta = chapter_metadata.get(doc.chapter_number, {})
+    chapter_title = meta.get("title", f"Chapter {doc.chapter_number}")
+    chunks = chunker.chunk_document(
+        sections=doc.sections,
+        chapter_title=chapter_title,
+        class_level=class_level,
+        exercise_title=doc.metadata.get("exercise_title", ""),
+    )
+    return doc, chapter_title, chunks
+
 
 class MathIngestionPipeline:
     """
@@ -32,8 +69,14 @@ class MathIngestionPipeline:
     ):
         self.extractor = LatexExtractor()
         self.chunker = MathChunker()
-        self.embedder = EmbeddingGenerator(embedding_model)
+        self.embedder = EmbeddingGenerator(
+            embedding_model,
+            cache_dir=os.getenv("EMBED_CACHE_DIR", ".embed_cache"),
+        )
         self.loader = SupabaseLoader(supabase_url, supabase_key)
+        # Highest chunk_index assigned so far per chapter_id; read from
+        # Supabase once per chapter, then advanced locally
+        self._max_idx: Dict[str, int] = {}
 
     # ------------------------------------------------------------------
 
@@ -41,7 +84,7 @@ class MathIngestionPipeline:
         self,
         directory: Path,
         class_level: int,
-        chapter_metadata: Dict[int, Dict[str, Any]] = None,
+        chapter_metadata: Mapping[int, Mapping[str, Any]] = None,
     ) -> Dict[str, Any]:
         results: Dict[str, Any] = {
             "processed": 0,
@@ -50,41 +93,156 @@ class MathIngestionPipeline:
             "chapters": [],
         }
 
-        tex_files = sorted(directory.glob("*.tex"))
+        tex_files = sorted(
+            Path(e.path)
+            for e in os.scandir(directory)
+            if e.name.endswith(".tex") and e.is_file()
+        )
         logger.info(f"Found {len(tex_files)} .tex files in {directory}")
+        if not tex_files:
+            return results
 
-        for fp in tex_files:
-            try:
-                r = self.process_file(
-                    file_path=fp,
-                    class_level=class_level,
-                    chapter_metadata=chapter_metadata,
+        # One query for the existing Math chapter ids, instead of a lookup
+        # per file in get_or_create_chapter
+        self.loader.prefetch_chapters(class_level, "Math")
+
+        # Phase 1: extract + chunk in worker processes, then resolve chapter
+        # records here, in file order, so chunk_index offsets are stable.
+        # "spawn" keeps workers from inheriting the parent's HTTP/SSL state.
+        prepared = []  # (file_path, doc, chapter_id, chunks)
+        # Plain dicts for the workers: the frozen subject tables may be
+        # MappingProxyType views, which cannot be pickled
+        worker_metadata = {n: dict(m) for n, m in (chapter_metadata or {}).items()}
+        with ProcessPoolExecutor(
+            max_workers=min(os.cpu_count() or 1, len(tex_files)),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool:
+            futures = [
+                pool.submit(
+                    _extract_and_chunk,
+                    self.extractor,
+                    self.chunker,
+                    fp,
+                    class_level,
+                    worker_metadata,
                 )
-                results["processed"] += 1
-                results["total_chunks"] += r["chunks_loaded"]
-                results["chapters"].append(r)
-            except Exception as e:
-                logger.error(f"Failed to process {fp.name}: {e}")
-                results["failed"] += 1
+                for fp in tex_files
+            ]
+            for fp, future in zip(tex_files, futures):
+                try:
+                    logger.info(f"Processing: {fp.name}")
+                    doc, chapter_title, chunks = future.result()
+                    chapter_id = self._resolve_chapter(
+                        fp, doc, chapter_title, chunks, class_level, chapter_metadata
+                    )
+                    prepared.append((fp, doc, chapter_id, chunks))
+                except Exception as e:
+                    logger.error(f"Failed to process {fp.name}: {e}")
+                    results["failed"] += 1
+
+        # Phases 2+3: embed chunks from many files together, so the API sees
+        # full batches instead of one short request per exercise file, and
+        # upload each group on a background thread while the next is embedded
+        with ThreadPoolExecutor(max_workers=1) as uploader:
+            uploads = []  # (file_path, future)
+            group: List[Tuple[Path, ExtractedDocument, str, List[Chunk]]] = []
+            group_size = 0
+            for i, item in enumerate(prepared):
+                group.append(item)
+                group_size += len(item[3])
+                if group_size >= EMBED_GROUP_SIZE or i == len(prepared) - 1:
+                    uploads += self._embed_and_submit(group, uploader, results)
+                    group, group_size = [], 0
+
+            for fp, future in uploads:
+                try:
+                    r = future.result()
+                    results["processed"] += 1
+                    results["total_chunks"] += r["chunks_loaded"]
+                    results["chapters"].append(r)
+                except Exception as e:
+                    logger.error(f"Failed to process {fp.name}: {e}")
+                    results["failed"] += 1
 
         return results
 
+    def _embed_and_submit(
+        self,
+        group: List[Tuple[Path, ExtractedDocument, str, List[Chunk]]],
+        uploader: ThreadPoolExecutor,
+        results: Dict[str, Any],
+    ) -> List[Tuple[Path, Future]]:
+        """Embed a group of files' chunks in one call; queue each file's upload."""
+        texts = [c.text for _, _, _, chunks in group for c in chunks]
+        try:
+            embeddings = self.embedder.generate_batch(texts) if texts else None
+        except Exception as e:
+            logger.error(f"Failed to embed {len(texts)} chunks: {e}")
+            results["failed"] += len(group)
+            return []
+
+        uploads = []
+        start = 0
+        for fp, doc, chapter_id, chunks in group:
+            file_embeddings = embeddings[start:start + len(chunks)] if chunks else None
+            start += len(chunks)
+            uploads.append(
+                (fp, uploader.submit(self._load, fp, doc, chapter_id, chunks, file_embeddings))
+            )
+        return uploads
+
     # ------------------------------------------------------------------
 
     def process_file(
         self,
         file_path: Path,
         class_level: int,
-        chapter_metadata: Dict[int, Dict[str, Any]] = None,
+        chapter_metadata: Mapping[int, Mapping[str, Any]] = None,
     ) -> Dict[str, Any]:
         chapter_metadata = chapter_metadata or {}
         logger.info(f"Processing: {file_path.name}")
 
-        # 1. Extract
-        doc = self.extractor.extract(file_path)
-        meta = chapter_metadata.get(doc.chapter_number, {})
-        chapter_title = meta.get("title", f"Chapter {doc.chapter_number}")
-        exercise_title = doc.metadata.get("exercise_title", "")
+        # 1. Extract + chunk
+        doc, chapter_title, chunks = _extract_and_chunk(
+            self.extractor, self.chunker, file_path, class_level, chapter_metadata
+        )
+
+        # 2-4. Chapter record + chunk_index offset
+        chapter_id = self._resolve_chapter(
+            file_path, doc, chapter_title, chunks, class_level, chapter_metadata
+        )
+
+        if not chunks:
+            return self._load(file_path, doc, chapter_id, chunks, None)
+
+        # 5-6. Embed + load in small batches, so only one batch of texts and
+        #      vectors is held at a time
+        loaded, errors = 0, []
+        for batch in itertools.batched(chunks, FILE_BATCH_SIZE):
+            embeddings = self.embedder.generate_batch([c.text for c in batch])
+            r = self._load(file_path, doc, chapter_id, list(batch), embeddings)
+            loaded += r["chunks_loaded"]
+            errors += r["errors"]
+
+        return {
+            "file": file_path.name,
+            "chapter_number": doc.chapter_number,
+            "chapter_id": chapter_id,
+            "chunks_loaded": loaded,
+            "errors": errors,
+        }
+
+    def _resolve_chapter(
+        self,
+        file_path: Path,
+        doc: ExtractedDocument,
+        chapter_title: str,
+        chunks: List[Chunk],
+        class_level: int,
+        chapter_metadata: Mapping[int, Mapping[str, Any]] = None,
+    ) -> str:
+        """Get or create the chapter record and shift *chunks* past existing indices."""
+        meta = (chapter_metadata or {}).get(doc.chapter_number, {})
 
         # 2. Get or create chapter record (shared across exercises)
         chapter_id = self.loader.get_or_create_chapter(
@@ -99,21 +257,29 @@ class MathIngestionPipeline:
 
         # 3. Figure out chunk_index offset so we don't collide with
         #    chunks from other exercise files of the same chapter.
-        offset = self._get_max_chunk_index(chapter_id) + 1
+        #    Only the first file of a chapter queries Supabase; this also
+        #    covers files whose chunks are not uploaded yet.
+        if chapter_id not in self._max_idx:
+            self._max_idx[chapter_id] = self._get_max_chunk_index(chapter_id)
+        offset = self._max_idx[chapter_id] + 1
+        self._max_idx[chapter_id] += len(chunks)
 
-        # 4. Chunk
-        chunks = self.chunker.chunk_document(
-            sections=doc.sections,
-            chapter_title=chapter_title,
-            class_level=class_level,
-            exercise_title=exercise_title,
-        )
-        # Apply offset
+        # 4. Apply offset
         for c in chunks:
             c.chunk_index += offset
 
         logger.info(f"  {len(chunks)} chunks (offset {offset})")
+        return chapter_id
 
+    def _load(
+        self,
+        file_path: Path,
+        doc: ExtractedDocument,
+        chapter_id: str,
+        chunks: List[Chunk],
+        embeddings,
+    ) -> Dict[str, Any]:
+        """Upload one file's chunks with their precomputed embeddings."""
         if not chunks:
             return {
                 "file": file_path.name,
@@ -123,17 +289,12 @@ class MathIngestionPipeline:
                 "errors": [],
             }
 
-        # 5. Embed
-        texts = [c.text for c in chunks]
-        embeddings = self.embedder.generate_batch(texts)
-
-        # 6. Load
         load_result = self.loader.load_chunks(
             chapter_id=chapter_id,
             chunks=chunks,
             embeddings=embeddings,
         )
-        logger.info(f"  Loaded {load_result.chunks_loaded} chunks")
+        logger.info(f"  Loaded {load_result.chunks_loaded} chunks from {file_path.name}")
 
         return {
             "file": file_path.name,
@@ -1,18 +1,47 @@
 """
 Orchestrate the full document processing pipeline.
 """
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
 from pathlib import Path
-from typing import List, Dict, Any
+from typing import List, Dict, Any, Mapping, Tuple
 import logging
+import multiprocessing
+import os
+import re
 
-from .docx_extractor import DocxExtractor
-from .text_chunker import TextChunker
+import numpy as np
+
+from .docx_extractor import DocxExtractor, ExtractedDocument
+from .text_chunker import Chunk, TextChunker
 from .embedding_generator import EmbeddingGenerator
 from .supabase_loader import SupabaseLoader
 
 
 logger = logging.getLogger(__name__)
 
+_CHAPTER_NUM_RE = re.compile(r"Chapter\s+(\d+)", re.IGNORECASE)
+
+
+def _extract_and_chunk(
+    extractor: DocxExtractor,
+    chunker: TextChunker,
+    file_path: Path,
+    metadata: Dict[str, Any],
+) -> Tuple[ExtractedDocument, str, List[Chunk]]:
+    """
+    CPU-bound half of the pipeline: parse and chunk one DOCX file.
+
+    Module-level (not a method) so it can run in a worker process; no
+    network clients are touched here.
+    """
+    doc = extractor.extract(file_path)
+    chapter_title = metadata.get("title", f"Chapter {doc.chapter_number}")
+    chunks = chunker.chunk_document(
+        sections=doc.sections,
+        chapter_title=chapter_title,
+    )
+    return doc, chapter_title, chunks
+
 
 class DocumentIngestionPipeline:
     """
@@ -32,7 +61,10 @@ class DocumentIngestionPipeline:
             chunk_size=chunk_size,
             chunk_overlap=chunk_overlap,
         )
-        self.embedder = EmbeddingGenerator(embedding_model)
+        self.embedder = EmbeddingGenerator(
+            embedding_model,
+            cache_dir=os.getenv("EMBED_CACHE_DIR", ".embed_cache"),
+        )
         self.loader = SupabaseLoader(supabase_url, supabase_key)
 
     def process_directory(
@@ -40,7 +72,7 @@ class DocumentIngestionPipeline:
         directory: Path,
         class_level: int,
         subject: str,
-        chapter_metadata: Dict[int, Dict[str, Any]] = None,
+        chapter_metadata: Mapping[int, Mapping[str, Any]] = None,
     ) -> Dict[str, Any]:
         """
         Process all DOCX files in a directory.
@@ -49,7 +81,7 @@ class DocumentIngestionPipeline:
             directory: Path to directory containing DOCX files
             class_level: Class level (9, 10, 11)
             subject: Subject name (e.g., "Physics")
-            chapter_metadata: Optional dict mapping chapter_number to metadata
+            chapter_metadata: Optional mapping of chapter_number to metadata
 
         Returns:
             Processing results summary
@@ -61,31 +93,67 @@ class DocumentIngestionPipeline:
             "chapters": [],
         }
 
-        docx_files = sorted(directory.glob("*.docx"))
+        docx_files = sorted(
+            Path(e.path)
+            for e in os.scandir(directory)
+            if e.name.endswith(".docx") and e.is_file()
+        )
         logger.info(f"Found {len(docx_files)} DOCX files")
+        if not docx_files:
+            return results
+
+        # One query for the subject's existing chapter ids, instead of a
+        # lookup per file in get_or_create_chapter
+        self.loader.prefetch_chapters(class_level, subject)
 
+        metas = []
         for file_path in docx_files:
-            try:
-                chapter_num = self._get_chapter_num(file_path.name)
-                meta = (
-                    chapter_metadata.get(chapter_num, {})
-                    if chapter_metadata
-                    else {}
-                )
-
-                result = self.process_file(
-                    file_path=file_path,
-                    class_level=class_level,
-                    subject=subject,
-                    metadata=meta,
-                )
-                results["processed"] += 1
-                results["total_chunks"] += result["chunks_loaded"]
-                results["chapters"].append(result)
-
-            except Exception as e:
-                logger.error(f"Failed to process {file_path}: {e}")
-                results["failed"] += 1
+            chapter_num = self._get_chapter_num(file_path.name)
+            # Copied to a plain dict, so read-only metadata types (which may
+            # not pickle, e.g. MappingProxyType) can go to the workers
+            metas.append(
+                dict(chapter_metadata.get(chapter_num, {}))
+                if chapter_metadata
+                else {}
+            )
+
+        # Extract + chunk in worker processes; Supabase and embedding calls
+        # stay in this process and run in file order. "spawn" keeps workers
+        # from inheriting the parent's HTTP/SSL state. Each file's upload runs
+        # on a background thread while the next file is embedded.
+        uploads = []  # (file_path, future)
+        with ProcessPoolExecutor(
+            max_workers=min(os.cpu_count() or 1, len(docx_files)),
+            mp_context=multiprocessing.get_context("spawn"),
+        ) as pool, ThreadPoolExecutor(max_workers=1) as uploader:
+            futures = [
+                pool.submit(_extract_and_chunk, self.extractor, self.chunker, fp, meta)
+                for fp, meta in zip(docx_files, metas)
+            ]
+            for file_path, meta, future in zip(docx_files, metas, futures):
+                try:
+                    logger.info(f"Processing: {file_path.name}")
+                    doc, chapter_title, chunks = future.result()
+                    chapter_id, embeddings = self._prepare(
+                        file_path, doc, chapter_title, chunks, class_level, subject, meta
+                    )
+                    uploads.append((
+                        file_path,
+                        uploader.submit(self._load, file_path, doc, chapter_id, chunks, embeddings),
+                    ))
+                except Exception as e:
+                    logger.error(f"Failed to process {file_path}: {e}")
+                    results["failed"] += 1
+
+            for file_path, upload in uploads:
+                try:
+                    result = upload.result()
+                    results["processed"] += 1
+                    results["total_chunks"] += result["chunks_loaded"]
+                    results["chapters"].append(result)
+                except Exception as e:
+                    logger.error(f"Failed to process {file_path}: {e}")
+                    results["failed"] += 1
 
         return results
 
@@ -94,7 +162,7 @@ class DocumentIngestionPipeline:
         file_path: Path,
         class_level: int,
         subject: str,
-        metadata: Dict[str, Any] = None,
+        metadata: Mapping[str, Any] = None,
     ) -> Dict[str, Any]:
         """
         Process a single DOCX file.
@@ -111,13 +179,31 @@ class DocumentIngestionPipeline:
         metadata = metadata or {}
         logger.info(f"Processing: {file_path.name}")
 
-        # Step 1: Extract text and structure
-        logger.info("  Step 1: Extracting text...")
-        doc = self.extractor.extract(file_path)
+        # Step 1: Extract text and structure, then chunk
+        logger.info("  Step 1: Extracting and chunking text...")
+        doc, chapter_title, chunks = _extract_and_chunk(
+            self.extractor, self.chunker, file_path, metadata
+        )
+        chapter_id, embeddings = self._prepare(
+            file_path, doc, chapter_title, chunks, class_level, subject, metadata
+        )
+        return self._load(file_path, doc, chapter_id, chunks, embeddings)
 
-        # Step 2: Get or create chapter in Supabase
-        chapter_title = metadata.get("title", f"Chapter {doc.chapter_number}")
+    def _prepare(
+        self,
+        file_path: Path,
+        doc: ExtractedDocument,
+        chapter_title: str,
+        chunks: List[Chunk],
+        class_level: int,
+        subject: str,
+        metadata: Mapping[str, Any] = None,
+    ) -> Tuple[str, np.ndarray]:
+        """Get or create the chapter record, then embed its chunks."""
+        metadata = metadata or {}
+        logger.info(f"    {len(chunks)} chunks")
 
+        # Get or create chapter in Supabase
         chapter_id = self.loader.get_or_create_chapter(
             class_level=class_level,
             subject=subject,
@@ -128,24 +214,29 @@ class DocumentIngestionPipeline:
             source_file=file_path.name,
         )
 
-        # Clear existing chunks (for re-processing)
-        self.loader.clear_chapter_chunks(chapter_id)
-
-        # Step 3: Chunk the document
-        logger.info("  Step 2: Chunking document...")
-        chunks = self.chunker.chunk_document(
-            sections=doc.sections,
-            chapter_title=chapter_title,
-        )
-        logger.info(f"    Created {len(chunks)} chunks")
-
-        # Step 4: Generate embeddings
-        logger.info("  Step 3: Generating embeddings...")
+        # Step 2: Generate embeddings
+        logger.info("  Step 2: Generating embeddings...")
         texts = [chunk.text for chunk in chunks]
         embeddings = self.embedder.generate_batch(texts)
+        return chapter_id, embeddings
 
-        # Step 5: Load to Supabase
-        logger.info("  Step 4: Loading to Supabase...")
+    def _load(
+        self,
+        file_path: Path,
+        doc: ExtractedDocument,
+        chapter_id: str,
+        chunks: List[Chunk],
+        embeddings: np.ndarray,
+    ) -> Dict[str, Any]:
+        """Replace the chapter's chunks with this file's."""
+        # Clear existing chunks (for re-processing). Done here rather than in
+        # _prepare so that, on the single uploader thread, each clear runs
+        # after the previous file's upload: when two files map to the same
+        # chapter, the last one wins, as in a sequential run.
+        self.loader.clear_chapter_chunks(chapter_id)
+
+        # Step 3: Load to Supabase
+        logger.info("  Step 3: Loading to Supabase...")
         load_result = self.loader.load_chunks(
             chapter_id=chapter_id,
             chunks=chunks,
@@ -164,7 +255,5 @@ class DocumentIngestionPipeline:
 
     def _get_chapter_num(self, filename: str) -> int:
         """Extract chapter number from filename."""
-        import re
-
-        match = re.search(r"Chapter\s+(\d+)", filename, re.IGNORECASE)
+        match = _CHAPTER_NUM_RE.search(filename)
         return int(match.group(1)) if match else 0
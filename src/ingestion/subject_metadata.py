@@ -1,552 +1,350 @@
 """
-Chapter metadata for all subjects (Class 9).
+Chapter metadata for all subjects (Classes 9 and 10).
+
+The chapter tables live in chapters.json next to this module and are read
+on first use, so importing this module costs a file lookup rather than
+building every subject's dicts. Each subject is built on first access as
+a read-only mapping of chapter number -> Chapter (a frozen, slotted
+dataclass); strings are interned, so topics repeated across subjects
+share one object.
+
+The legacy per-subject names (PHYSICS_CLASS_9_CHAPTERS, ...), TOPIC_INDEX
+and the column arrays (TITLES, TOPICS_FLAT, ...) resolve lazily through
+the module __getattr__ below.
 """
+from __future__ import annotations
 
-# Physics Class 9
-PHYSICS_CLASS_9_CHAPTERS = {
-    1: {
-        "title": "Physical Quantities and Measurement",
-        "description": "Covers fundamental and derived quantities, SI units, scientific notation, measuring instruments.",
-        "topics": ["physical quantities", "SI units", "measurement", "vernier caliper", "screw gauge"],
-    },
-    2: {
-        "title": "Kinematics",
-        "description": "Describes motion in one dimension including displacement, velocity, acceleration.",
-        "topics": ["motion", "displacement", "velocity", "acceleration", "equations of motion"],
-    },
-    3: {
-        "title": "Dynamics",
-        "description": "Covers Newton's laws of motion, force, momentum, friction.",
-        "topics": ["force", "Newton laws", "momentum", "friction", "inertia"],
-    },
-    4: {
-        "title": "Turning Effect of Forces",
-        "description": "Explains torque, equilibrium, center of gravity, couples, and stability.",
-        "topics": ["torque", "moment of force", "equilibrium", "center of gravity"],
-    },
-    5: {
-        "title": "Gravitation",
-        "description": "Covers gravitational force, Newton's law of gravitation, mass and weight.",
-        "topics": ["gravitation", "gravity", "mass", "weight", "gravitational field"],
-    },
-    6: {
-        "title": "Work and Energy",
-        "description": "Describes work, energy, power, kinetic and potential energy.",
-        "topics": ["work", "energy", "power", "kinetic energy", "potential energy"],
-    },
-    7: {
-        "title": "Properties of Matter",
-        "description": "Covers states of matter, density, pressure, atmospheric pressure.",
-        "topics": ["density", "pressure", "atmospheric pressure", "Archimedes principle"],
-    },
-    8: {
-        "title": "Thermal Properties of Matter",
-        "description": "Explains temperature, heat, thermal expansion, specific heat capacity.",
-        "topics": ["temperature", "heat", "thermal expansion", "specific heat"],
-    },
-    9: {
-        "title": "Transfer of Heat",
-        "description": "Covers conduction, convection, radiation, and applications.",
-        "topics": ["conduction", "convection", "radiation", "thermal conductivity"],
-    },
-}
+__all__ = (
+    "CLASS_IDS",
+    "CLASS_LEVELS",
+    "Chapter",
+    "EMPTY_CHAPTERS",
+    "SUBJECTS",
+    "SUBJECT_IDS",
+    "SUBJECT_METADATA",
+    "SUBJECT_NAMES",
+    "count_topic_matches",
+    "get_chapter",
+    "iter_topic_matches",
+    "lookup_topic",
+    "scan_document",
+)
 
-# Chemistry Class 9
-CHEMISTRY_CLASS_9_CHAPTERS = {
-    1: {
-        "title": "Matter and Its States",
-        "description": "Introduction to matter, properties, states, and classification.",
-        "topics": ["matter", "solid", "liquid", "gas", "properties of matter"],
-    },
-    2: {
-        "title": "Atomic Structure",
-        "description": "Covers atomic models, subatomic particles, electronic configuration.",
-        "topics": ["atom", "electron", "proton", "neutron", "atomic model", "electronic configuration"],
-    },
-    3: {
-        "title": "Periodic Table and Periodicity",
-        "description": "Organization of elements, groups, periods, and periodic trends.",
-        "topics": ["periodic table", "groups", "periods", "periodicity", "elements"],
-    },
-    4: {
-        "title": "Chemical Bonding",
-        "description": "Ionic and covalent bonds, electronegativity, bond formation.",
-        "topics": ["ionic bond", "covalent bond", "electronegativity", "chemical bonding"],
-    },
-    5: {
-        "title": "Physical States of Matter",
-        "description": "Gas laws, kinetic theory, changes of state.",
-        "topics": ["gas laws", "kinetic theory", "Boyle's law", "Charles law", "states of matter"],
-    },
-    6: {
-        "title": "Solutions",
-        "description": "Types of solutions, concentration, solubility.",
-        "topics": ["solution", "solute", "solvent", "concentration", "solubility"],
-    },
-    7: {
-        "title": "Electrochemistry",
-        "description": "Electrochemical cells, oxidation-reduction reactions.",
-        "topics": ["electrochemistry", "oxidation", "reduction", "electrochemical cell"],
-    },
-    8: {
-        "title": "Chemical Reactivity",
-        "description": "Types of chemical reactions, reactivity series.",
-        "topics": ["chemical reactions", "reactivity", "reactivity series", "displacement"],
-    },
-    9: {
-        "title": "Environmental Chemistry",
-        "description": "Atmosphere, pollution, greenhouse effect.",
-        "topics": ["environment", "pollution", "atmosphere", "greenhouse effect"],
-    },
-    10: {
-        "title": "Acids, Bases and Salts",
-        "description": "Properties of acids, bases, pH scale, neutralization.",
-        "topics": ["acids", "bases", "pH", "neutralization", "salts"],
-    },
-    11: {
-        "title": "Organic Chemistry",
-        "description": "Hydrocarbons, functional groups, nomenclature.",
-        "topics": ["organic chemistry", "hydrocarbons", "alkanes", "alkenes", "functional groups"],
-    },
-    12: {
-        "title": "Biochemistry",
-        "description": "Carbohydrates, proteins, lipids, enzymes.",
-        "topics": ["biochemistry", "carbohydrates", "proteins", "lipids", "enzymes"],
-    },
-}
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass, fields
+from importlib import resources
+from types import MappingProxyType
+from typing import Final, FrozenSet, Tuple
+import functools
+import json
+import re
+import sys
 
-# Biology Class 9
-BIOLOGY_CLASS_9_CHAPTERS = {
-    1: {
-        "title": "Introduction to Biology",
-        "description": "What is biology, branches, importance, and scientific method.",
-        "topics": ["biology", "branches of biology", "scientific method", "biodiversity"],
-    },
-    2: {
-        "title": "Solving a Biological Problem",
-        "description": "Scientific inquiry, hypothesis, experiments, data analysis.",
-        "topics": ["scientific method", "hypothesis", "experiment", "data analysis"],
-    },
-    3: {
-        "title": "Biodiversity",
-        "description": "Classification of organisms, five kingdoms, taxonomy.",
-        "topics": ["biodiversity", "classification", "taxonomy", "kingdoms", "species"],
-    },
-    4: {
-        "title": "Cells and Tissues",
-        "description": "Cell structure, organelles, plant and animal cells, tissues.",
-        "topics": ["cell", "organelles", "tissues", "plant cell", "animal cell"],
-    },
-    5: {
-        "title": "Cell Cycle",
-        "description": "Cell division, mitosis, meiosis, cell growth.",
-        "topics": ["cell cycle", "mitosis", "meiosis", "cell division"],
-    },
-    6: {
-        "title": "Enzymes",
-        "description": "Enzyme structure, function, factors affecting enzyme activity.",
-        "topics": ["enzymes", "catalysis", "enzyme activity", "active site"],
-    },
-    7: {
-        "title": "Bioenergetics",
-        "description": "Photosynthesis, respiration, ATP, energy transfer.",
-        "topics": ["photosynthesis", "respiration", "ATP", "bioenergetics"],
-    },
-    8: {
-        "title": "Nutrition",
-        "description": "Nutrients, balanced diet, digestion, absorption.",
-        "topics": ["nutrition", "nutrients", "diet", "digestion", "absorption"],
-    },
-    9: {
-        "title": "Transport",
-        "description": "Circulatory system, blood, heart, transportation in plants.",
-        "topics": ["transport", "circulatory system", "blood", "heart", "xylem", "phloem"],
-    },
-    10: {
-        "title": "Gaseous Exchange",
-        "description": "Respiratory system, breathing, gas exchange in plants and animals.",
-        "topics": ["respiration", "breathing", "lungs", "gas exchange", "stomata"],
-    },
-}
+try:
+    import orjson
+except ImportError:
+    orjson = None
 
-# Computer Science Class 9 (Only chapters 1, 2, 3, 5 available)
-COMPUTER_SCIENCE_CLASS_9_CHAPTERS = {
-    1: {
-        "title": "Introduction to Computer Science",
-        "description": "Basic concepts, computer systems, hardware and software.",
-        "topics": ["computer", "hardware", "software", "computer system"],
-    },
-    2: {
-        "title": "Computer Architecture",
-        "description": "CPU, memory, storage devices, input/output devices.",
-        "topics": ["CPU", "memory", "storage", "input devices", "output devices"],
-    },
-    3: {
-        "title": "Number Systems",
-        "description": "Binary, decimal, hexadecimal, conversion between systems.",
-        "topics": ["binary", "decimal", "hexadecimal", "number systems", "conversion"],
-    },
-    5: {
-        "title": "Operating Systems",
-        "description": "Types of OS, functions, file management.",
-        "topics": ["operating system", "OS", "file management", "Windows", "Linux"],
-    },
-}
+try:
+    import re2
+except ImportError:
+    re2 = None
 
-# English Class 9
-ENGLISH_CLASS_9_CHAPTERS = {
-    1: {
-        "title": "Grammar - Parts of Speech",
-        "description": "Nouns, pronouns, verbs, adjectives, adverbs, prepositions.",
-        "topics": ["grammar", "parts of speech", "noun", "verb", "adjective", "adverb"],
-    },
-    2: {
-        "title": "Tenses",
-        "description": "Present, past, future tenses and their forms.",
-        "topics": ["tenses", "present tense", "past tense", "future tense"],
-    },
-    3: {
-        "title": "Active and Passive Voice",
-        "description": "Converting between active and passive voice.",
-        "topics": ["active voice", "passive voice", "voice conversion"],
-    },
-    4: {
-        "title": "Direct and Indirect Speech",
-        "description": "Reported speech, narration changes.",
-        "topics": ["direct speech", "indirect speech", "reported speech", "narration"],
-    },
-    5: {
-        "title": "Reading Comprehension",
-        "description": "Understanding passages, inference, main idea.",
-        "topics": ["comprehension", "reading", "inference", "main idea"],
-    },
-    6: {
-        "title": "Essay Writing",
-        "description": "Types of essays, structure, introduction, conclusion.",
-        "topics": ["essay", "writing", "paragraph", "introduction", "conclusion"],
-    },
-    7: {
-        "title": "Letter Writing",
-        "description": "Formal and informal letters, format, structure.",
-        "topics": ["letter", "formal letter", "informal letter", "letter format"],
-    },
-    8: {
-        "title": "Poetry Analysis",
-        "description": "Understanding poetry, literary devices, themes.",
-        "topics": ["poetry", "literary devices", "metaphor", "simile", "theme"],
-    },
-    9: {
-        "title": "Sentence Structure",
-        "description": "Simple, compound, complex sentences.",
-        "topics": ["sentence", "clause", "phrase", "sentence structure"],
-    },
-    10: {
-        "title": "Punctuation and Capitalization",
-        "description": "Proper use of punctuation marks and capitalization rules.",
-        "topics": ["punctuation", "capitalization", "comma", "period", "apostrophe"],
-    },
-    11: {
-        "title": "Vocabulary Building",
-        "description": "Word meanings, synonyms, antonyms, idioms.",
-        "topics": ["vocabulary", "synonyms", "antonyms", "idioms", "phrases"],
-    },
-    12: {
-        "title": "Story Writing and Creative Writing",
-        "description": "Narrative techniques, plot development, character building.",
-        "topics": ["story writing", "narrative", "creative writing", "plot", "character"],
-    },
-}
+# Read-only container for the tables below: the frozendict C extension
+# when installed (a real immutable dict: hashable, picklable, faster
+# lookups), otherwise a MappingProxyType view over a private dict
+try:
+    from frozendict import frozendict as _frozen
+except ImportError:
+    _frozen = MappingProxyType
 
-# Math Class 9
-MATH_CLASS_9_CHAPTERS = {
-    1: {
-        "title": "Matrices and Determinants",
-        "description": "Introduction to matrices, types, operations, determinants, and their properties.",
-        "topics": ["matrices", "determinants", "matrix operations", "transpose", "adjoint", "inverse"],
-    },
-    2: {
-        "title": "Real and Complex Numbers",
-        "description": "Real number system, complex numbers, properties, and operations.",
-        "topics": ["real numbers", "complex numbers", "irrational numbers", "properties of numbers"],
-    },
-    3: {
-        "title": "Logarithms",
-        "description": "Definition of logarithm, laws of logarithms, common and natural logarithms.",
-        "topics": ["logarithm", "log laws", "common logarithm", "natural logarithm", "antilogarithm"],
-    },
-    4: {
-        "title": "Algebraic Expressions and Algebraic Formulas",
-        "description": "Algebraic expressions, factorization, HCF, LCM, and algebraic identities.",
-        "topics": ["algebraic expressions", "factorization", "HCF", "LCM", "algebraic formulas", "polynomials"],
-    },
-    5: {
-        "title": "Factorization",
-        "description": "Methods of factorization including grouping, identities, and factor theorem.",
-        "topics": ["factorization", "factor theorem", "remainder theorem", "grouping", "cubic factorization"],
-    },
-    6: {
-        "title": "Algebraic Manipulation",
-        "description": "Simplification of algebraic fractions, operations on rational expressions.",
-        "topics": ["algebraic fractions", "rational expressions", "simplification", "square root"],
-    },
-    7: {
-        "title": "Linear Equations and Inequalities",
-        "description": "Solving linear equations, simultaneous equations, and linear inequalities.",
-        "topics": ["linear equations", "simultaneous equations", "inequalities", "elimination", "substitution"],
-    },
-    8: {
-        "title": "Linear Graphs and Their Application",
-        "description": "Cartesian plane, plotting points, graphing linear equations, slope and intercept.",
-        "topics": ["coordinate geometry", "linear graphs", "slope", "intercept", "Cartesian plane"],
-    },
-    9: {
-        "title": "Introduction to Coordinate Geometry",
-        "description": "Distance formula, midpoint, section formula, collinearity, and area of triangles.",
-        "topics": ["coordinate geometry", "distance formula", "midpoint", "section formula", "collinear points"],
-    },
-    10: {
-        "title": "Congruent Triangles",
-        "description": "Triangle congruence criteria SSS, SAS, ASA, AAS, and RHS.",
-        "topics": ["congruent triangles", "SSS", "SAS", "ASA", "AAS", "congruence"],
-    },
-    11: {
-        "title": "Parallelograms and Triangles",
-        "description": "Properties of parallelograms, theorems on triangles and parallelograms.",
-        "topics": ["parallelogram", "triangles", "midpoint theorem", "area of triangle"],
-    },
-}
+CLASS_LEVELS: Final[Tuple[int, ...]] = (9, 10)
+SUBJECTS: Final[Tuple[str, ...]] = ("Physics", "Chemistry", "Biology", "Computer Science", "English", "Math")
 
-# Math Class 10
-MATH_CLASS_10_CHAPTERS = {
-    1: {
-        "title": "Quadratic Equations",
-        "description": "Solving quadratic equations by factorization, completing the square, and quadratic formula.",
-        "topics": ["quadratic equations", "quadratic formula", "factorization", "completing the square", "discriminant"],
-    },
-    2: {
-        "title": "Theory of Quadratic Equations",
-        "description": "Nature of roots, sum and product of roots, formation of equations.",
-        "topics": ["roots of equations", "discriminant", "sum of roots", "product of roots", "nature of roots"],
-    },
-    3: {
-        "title": "Variations",
-        "description": "Direct, inverse, and joint variation. Proportionality and related problems.",
-        "topics": ["direct variation", "inverse variation", "joint variation", "proportionality", "k-method"],
-    },
-    4: {
-        "title": "Partial Fractions",
-        "description": "Decomposition of rational expressions into partial fractions.",
-        "topics": ["partial fractions", "rational expressions", "linear factors", "repeated factors", "quadratic factors"],
-    },
-    5: {
-        "title": "Sets and Functions",
-        "description": "Set notation, operations, Venn diagrams, functions and their types.",
-        "topics": ["sets", "Venn diagrams", "union", "intersection", "functions", "domain", "range"],
-    },
-    6: {
-        "title": "Basic Statistics",
-        "description": "Measures of central tendency, mean, median, mode, and grouped data.",
-        "topics": ["statistics", "mean", "median", "mode", "grouped data", "frequency distribution"],
-    },
-    7: {
-        "title": "Introduction to Trigonometry",
-        "description": "Trigonometric ratios, identities, and angles of elevation and depression.",
-        "topics": ["trigonometry", "sin", "cos", "tan", "trigonometric ratios", "trigonometric identities"],
-    },
-    8: {
-        "title": "Projection of a Side of a Triangle",
-        "description": "Projection formulas, law of cosines, and applications in triangles.",
-        "topics": ["projection", "law of cosines", "triangle sides", "obtuse triangle", "acute triangle"],
-    },
-    9: {
-        "title": "Chords of a Circle",
-        "description": "Properties of chords, perpendicular from center, equal chords.",
-        "topics": ["chords", "circle", "perpendicular bisector", "equal chords", "arc"],
-    },
-    10: {
-        "title": "Tangent to a Circle",
-        "description": "Tangent properties, tangent from external point, and related theorems.",
-        "topics": ["tangent", "circle", "external point", "tangent length", "tangent theorems"],
-    },
-    11: {
-        "title": "Chords and Arcs",
-        "description": "Relationship between chords and arcs, inscribed angles, central angles.",
-        "topics": ["chords", "arcs", "inscribed angle", "central angle", "arc length"],
-    },
-    12: {
-        "title": "Angle in a Segment of a Circle",
-        "description": "Angles in same segment, cyclic quadrilaterals, and related theorems.",
-        "topics": ["angle in segment", "cyclic quadrilateral", "inscribed angle theorem", "semicircle"],
-    },
-}
+# Small-integer codes for subjects and classes (both directions), for
+# compact keys and the int8 column arrays below
+SUBJECT_NAMES: Final[Tuple[str, ...]] = SUBJECTS
+SUBJECT_IDS: Final[Mapping[str, int]] = _frozen({name: i for i, name in enumerate(SUBJECTS)})
+CLASS_IDS: Final[Mapping[int, int]] = _frozen({level: i for i, level in enumerate(CLASS_LEVELS)})
 
-# ============================================================================
-# CLASS 10 CHAPTERS
-# ============================================================================
-
-# Chemistry Class 10
-CHEMISTRY_CLASS_10_CHAPTERS = {
-    1: {
-        "title": "History of Chemistry",
-        "description": "Covers fundamental principles and methods used in chemistry, including scientific paradigms, conservation laws, and evolution of scientific ideas.",
-        "topics": ["conservation of mass", "scientific method", "atomic models", "phlogiston theory", "repeatability"],
-    },
-    2: {
-        "title": "Matter",
-        "description": "Explores physical states of matter and changes between them, explaining phase transitions, kinetic particle theory, and gas laws.",
-        "topics": ["states of matter", "phase transitions", "gas laws", "kinetic theory", "diffusion"],
-    },
-    3: {
-        "title": "Stoichiometry",
-        "description": "Examines quantitative relationships in chemical reactions, including mole concept, limiting reactants, and yield calculations.",
-        "topics": ["mole concept", "limiting reactants", "percentage yield", "empirical formula", "molarity"],
-    },
-    4: {
-        "title": "Electrochemistry",
-        "description": "Covers electrochemical cells and processes, including electrolysis, electroplating, galvanic cells, and electrochemical series.",
-        "topics": ["electrolysis", "electroplating", "galvanic cells", "electrochemical series", "fuel cells"],
-    },
-    5: {
-        "title": "Chemical Kinetics",
-        "description": "Studies rates of chemical reactions, collision theory, activation energy, and role of catalysts in processes.",
-        "topics": ["reaction rates", "collision theory", "activation energy", "catalysts", "Maxwell-Boltzmann distribution"],
-    },
-    6: {
-        "title": "Salts",
-        "description": "Explores formation, properties, and preparation of salts, including solubility rules and crystallization techniques.",
-        "topics": ["ionic salts", "lattice structure", "solubility", "crystallization", "titration"],
-    },
-    7: {
-        "title": "Nitrogen, Sulfur, and Metals",
-        "description": "Covers industrial chemical processes, environmental chemistry including acid rain, and metal reactivity.",
-        "topics": ["acid rain", "Haber process", "contact process", "metal reactivity", "amphoteric oxides"],
-    },
-}
+# Shared chapter table for subjects with no chapters listed yet, so callers
+# can skip them with an identity check
+EMPTY_CHAPTERS: Final[Mapping[int, Chapter]] = _frozen({})
 
-# Biology Class 10
-BIOLOGY_CLASS_10_CHAPTERS = {
-    1: {
-        "title": "Digestive System",
-        "description": "Explains structure and function of human digestive system, including alimentary canal and digestive processes.",
-        "topics": ["alimentary canal", "chemical digestion", "enzymes", "absorption", "liver function"],
-    },
-    2: {
-        "title": "Blood Circulatory System",
-        "description": "Covers cardiovascular system including blood composition, heart structure, blood vessels, and circulation pathways.",
-        "topics": ["blood components", "heart structure", "blood vessels", "circulation", "heart diseases"],
-    },
-    3: {
-        "title": "Respiratory System",
-        "description": "Examines structure and function of respiratory system, breathing mechanism, and gas exchange in alveoli.",
-        "topics": ["air passageway", "breathing mechanism", "gas exchange", "alveoli", "respiratory diseases"],
-    },
-    4: {
-        "title": "Urinary System",
-        "description": "Explores excretory system including kidney structure, nephron function, and urine formation processes.",
-        "topics": ["kidney structure", "nephron", "urine formation", "filtration", "osmoregulation"],
-    },
-    5: {
-        "title": "Nervous System",
-        "description": "Covers organization and function of nervous system, including CNS, PNS, brain structure, and response coordination.",
-        "topics": ["CNS", "PNS", "brain structure", "neurons", "stimulus response"],
-    },
-    6: {
-        "title": "Animal Reproduction",
-        "description": "Examines sexual reproduction in animals, focusing on hormonal regulation and gametogenesis processes.",
-        "topics": ["reproductive hormones", "spermatogenesis", "oogenesis", "fertilization", "sexual characteristics"],
-    },
-    7: {
-        "title": "Inheritance",
-        "description": "Introduces genetics and inheritance principles, covering chromosome structure, genes, and Mendelian genetics.",
-        "topics": ["chromosomes", "genes and alleles", "genotype and phenotype", "Mendelian genetics", "dominant and recessive"],
-    },
-    8: {
-        "title": "Diseases",
-        "description": "Classifies and describes various types of diseases including infectious, non-infectious, and zoonotic diseases.",
-        "topics": ["disease classification", "infectious diseases", "zoonotic diseases", "vector-borne diseases", "COVID-19"],
-    },
-    9: {
-        "title": "Immunity and the Immune System",
-        "description": "Explores body's defense mechanisms, immune system structure and function, and how immunity protects against pathogens.",
-        "topics": ["immune system", "antibodies", "cell-mediated immunity", "inflammation", "vaccination"],
-    },
-    10: {
-        "title": "Biotechnology",
-        "description": "Covers modern biotechnology applications in agriculture and food production, including GM crops and bio-fortification.",
-        "topics": ["biotechnology", "GM crops", "bio-fortification", "disease resistance", "drought tolerance"],
-    },
-    11: {
-        "title": "Biostatistics and Data Handling",
-        "description": "Introduces biostatistics and its applications in biology, medicine, and agriculture, covering data analysis methods.",
-        "topics": ["biostatistics", "data analysis", "epidemiology", "public health", "central tendency"],
-    },
-}
 
-# Physics Class 10
-PHYSICS_CLASS_10_CHAPTERS = {
-    1: {
-        "title": "Heat Capacity and Modes of Heat Transfer",
-        "description": "Covers heat capacity, specific heat capacity, and three modes of heat transfer (conduction, convection, radiation).",
-        "topics": ["heat capacity", "specific heat capacity", "calorimetry", "conduction", "convection", "radiation"],
-    },
-    2: {
-        "title": "Thermal Transformations",
-        "description": "Explores kinetic theory of matter, thermal expansion of solids and liquids, and phase changes including latent heat.",
-        "topics": ["kinetic theory", "thermal expansion", "phase changes", "evaporation", "latent heat", "bimetallic strips"],
-    },
-    3: {
-        "title": "Waves",
-        "description": "Introduces wave motion, types of waves (transverse and longitudinal), and wave parameters like wavelength, frequency, and amplitude.",
-        "topics": ["wave motion", "transverse waves", "longitudinal waves", "wavelength", "frequency", "amplitude"],
-    },
-    4: {
-        "title": "Sound",
-        "description": "Covers production and propagation of sound waves, ultrasound, infrasound, speed of sound, and applications like sonar.",
-        "topics": ["sound waves", "ultrasound", "infrasound", "speed of sound", "echo", "sonar"],
-    },
-    5: {
-        "title": "Optics",
-        "description": "Examines behavior of light including reflection, refraction, refractive index, lenses, mirrors, and optical instruments.",
-        "topics": ["reflection", "refraction", "refractive index", "Snell's law", "lenses", "mirrors"],
-    },
-    6: {
-        "title": "Electrostatics",
-        "description": "Introduces static electricity, electric charge, charging methods, conductors and insulators, and electric fields.",
-        "topics": ["static charge", "charge conservation", "conductors and insulators", "electric field", "Coulomb's law"],
-    },
-    7: {
-        "title": "Current Electricity",
-        "description": "Covers electric current, potential difference, Ohm's law, resistance, electrical circuits, and power in electrical systems.",
-        "topics": ["electric current", "potential difference", "Ohm's law", "resistance", "circuits", "electrical power"],
-    },
-}
+@dataclass(frozen=True, slots=True)
+class Chapter:
+    """
+    Metadata for one chapter.
+
+    topics keeps the display casing; topics_lc (stripped, lowercased) is
+    what matching code compares, and topics_set is the same for `in` checks; search_text is
+    the one-string form used for chapter embeddings. ch["title"] and
+    ch.get("title") still work for code written against the old dicts.
+    """
+
+    title: str
+    description: str
+    topics: Tuple[str, ...]
+    topics_lc: Tuple[str, ...]
+    topics_set: FrozenSet[str]
+    search_text: str
+
+    def __getitem__(self, key: str):
+        if key in _CHAPTER_FIELDS:
+            return getattr(self, key)
+        raise KeyError(key)
+
+    def get(self, key: str, default=None):
+        return getattr(self, key) if key in _CHAPTER_FIELDS else default
+
+    def keys(self) -> Tuple[str, ...]:
+        return _CHAPTER_FIELDS
+
+
+_CHAPTER_FIELDS = tuple(f.name for f in fields(Chapter))
+
+# (title, description, topics) -> Chapter, so a chapter listed identically
+# under several classes or subjects is one shared record
+_CHAPTER_INTERN: dict = {}
+
+
+def _chapter(meta: dict) -> Chapter:
+    """Build (or reuse) the Chapter for a chapters.json entry, interning every string."""
+    title = sys.intern(meta.get("title", ""))
+    description = sys.intern(meta.get("description", ""))
+    topics = tuple(sys.intern(t) for t in meta.get("topics", ()))
+    key = (title, description, topics)
+    chapter = _CHAPTER_INTERN.get(key)
+    if chapter is None:
+        topics_lc = tuple(sys.intern(t.strip().lower()) for t in topics)
+        chapter = _CHAPTER_INTERN[key] = Chapter(
+            title=title,
+            description=description,
+            topics=topics,
+            topics_lc=topics_lc,
+            topics_set=frozenset(topics_lc),
+            search_text=sys.intern(f"{title}. {description} Topics: {', '.join(topics)}"),
+        )
+    return chapter
+
+
+@functools.cache
+def _load_raw() -> dict:
+    """Parse chapters.json once per process (with orjson when installed)."""
+    return (orjson or json).loads(resources.files(__package__).joinpath("chapters.json").read_bytes())
+
+
+@functools.cache
+def _load(class_level: int, subject: str) -> Mapping:
+    """Read-only {chapter_number: Chapter} table for one class and subject."""
+    chapters = _load_raw().get(str(class_level), {}).get(subject)
+    if not chapters:
+        return EMPTY_CHAPTERS
+    return _frozen({int(num): _chapter(meta) for num, meta in chapters.items()})
+
+
+class _ClassMetadata(Mapping):
+    """
+    Subject -> chapter table for one class; each subject loads on first access.
+
+    Keys iterate as subject names; a SUBJECT_IDS code works as a key too.
+    """
+
+    def __init__(self, class_level: int):
+        self._class_level = class_level
+
+    def __getitem__(self, subject) -> Mapping:
+        if type(subject) is int and 0 <= subject < len(SUBJECTS):
+            subject = SUBJECTS[subject]
+        elif subject not in SUBJECT_IDS:
+            raise KeyError(subject)
+        return _load(self._class_level, subject)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(SUBJECTS)
+
+    def __len__(self) -> int:
+        return len(SUBJECTS)
+
+    def __repr__(self) -> str:
+        return f"<subject metadata for class {self._class_level}>"
 
-# English Class 10 (No content available yet)
-ENGLISH_CLASS_10_CHAPTERS = {}
-
-# Computer Science Class 10 (No content available yet)
-COMPUTER_SCIENCE_CLASS_10_CHAPTERS = {}
-
-# ============================================================================
-# METADATA MAPPINGS
-# ============================================================================
-
-# Mapping of subject names to their chapter metadata by class
-SUBJECT_METADATA = {
-    9: {
-        "Physics": PHYSICS_CLASS_9_CHAPTERS,
-        "Chemistry": CHEMISTRY_CLASS_9_CHAPTERS,
-        "Biology": BIOLOGY_CLASS_9_CHAPTERS,
-        "Computer Science": COMPUTER_SCIENCE_CLASS_9_CHAPTERS,
-        "English": ENGLISH_CLASS_9_CHAPTERS,
-        "Math": MATH_CLASS_9_CHAPTERS,
-    },
-    10: {
-        "Physics": PHYSICS_CLASS_10_CHAPTERS,
-        "Chemistry": CHEMISTRY_CLASS_10_CHAPTERS,
-        "Biology": BIOLOGY_CLASS_10_CHAPTERS,
-        "Computer Science": COMPUTER_SCIENCE_CLASS_10_CHAPTERS,
-        "English": ENGLISH_CLASS_10_CHAPTERS,
-        "Math": MATH_CLASS_10_CHAPTERS,
-    },
+
+# Mapping of class level -> subject name -> chapter metadata
+SUBJECT_METADATA: Final[Mapping[int, Mapping[str, Mapping[int, Chapter]]]] = _frozen(
+    {class_level: _ClassMetadata(class_level) for class_level in CLASS_LEVELS}
+)
+
+
+@functools.cache
+def _dense(class_level: int, subject: str) -> tuple:
+    """Chapters of one class/subject by position: entry n - 1 is chapter n (None for gaps)."""
+    chapters = _load(class_level, subject)
+    if not chapters:
+        return ()
+    return tuple(chapters.get(n) for n in range(1, max(chapters) + 1))
+
+
+def get_chapter(class_level: int, subject: str, chapter_number: int, default=None):
+    """
+    Metadata for one chapter, or *default* if it is not listed.
+
+    One cached lookup for the (class, subject) table plus one tuple index,
+    instead of walking SUBJECT_METADATA level by level.
+    """
+    if subject not in SUBJECT_IDS:
+        return default
+    chapters = _dense(class_level, subject)
+    if 0 < chapter_number <= len(chapters):
+        chapter = chapters[chapter_number - 1]
+        if chapter is not None:
+            return chapter
+    return default
+
+
+@functools.cache
+def _topic_index() -> Mapping:
+    """Build the topic -> chapters index on first use (loads every subject)."""
+    index: dict = {}
+    for class_level in CLASS_LEVELS:
+        for subject in SUBJECTS:
+            for num, meta in _load(class_level, subject).items():
+                for topic in meta.topics_lc:
+                    index.setdefault(topic, []).append(
+                        (class_level, subject, num)
+                    )
+    return _frozen({t: tuple(refs) for t, refs in index.items()})
+
+
+def lookup_topic(topic: str) -> tuple:
+    """
+    (class_level, subject, chapter_number) for every chapter listing *topic*.
+
+    Case-insensitive exact match; returns () for unknown topics.
+    """
+    return _topic_index().get(topic.strip().lower(), ())
+
+
+@functools.cache
+def _topic_pattern():
+    """
+    One case-insensitive alternation over every topic, longest first,
+    matched on word boundaries. Compiled with RE2 (a DFA, linear in the
+    document) when google-re2 is installed.
+    """
+    topics = sorted(_topic_index(), key=len, reverse=True)
+    pattern = r"(?i)\b(?:" + "|".join(re.escape(t) for t in topics) + r")\b"
+    return (re2 or re).compile(pattern)
+
+
+def scan_document(text: str) -> Iterator[Tuple[str, tuple]]:
+    """
+    Yield (topic, chapter refs) for every topic mentioned in *text*, in
+    order of appearance; refs are as returned by lookup_topic.
+    """
+    for topic, _, refs in _iter_topics(text):
+        yield topic, refs
+
+
+def iter_topic_matches(text: str) -> Iterator[Tuple[int, str, int, str, int]]:
+    """
+    Yield (class_level, subject, chapter_number, topic, offset) for every
+    topic mention in *text*, once per chapter listing that topic; offset
+    is the start of the mention in *text*.
+    """
+    for topic, offset, refs in _iter_topics(text):
+        for class_level, subject, num in refs:
+            yield class_level, subject, num, topic, offset
+
+
+def _iter_topics(text: str) -> Iterator[Tuple[str, int, tuple]]:
+    """One pass over *text*: (lowercased topic, offset, chapter refs) per mention."""
+    index = _topic_index()
+    for m in _topic_pattern().finditer(text):
+        topic = m.group(0).lower()
+        refs = index.get(topic)
+        if refs:
+            yield topic, m.start(), refs
+
+
+# Column arrays over every chapter, built on first access (see __getattr__)
+_COLUMN_NAMES = (
+    "CLASS_LEVEL", "SUBJECT_ID", "CHAPTER_NUMBER", "TITLES",
+    "TOPICS_FLAT", "TOPICS_OFFSETS", "TOPIC_CHAPTER",
+)
+
+
+@functools.cache
+def _columns() -> dict:
+    """
+    Struct-of-arrays view of all chapters: row i of CLASS_LEVEL, SUBJECT_ID
+    (SUBJECT_IDS code), CHAPTER_NUMBER and TITLES describes one chapter.
+    Its lowercased topics are TOPICS_FLAT[TOPICS_OFFSETS[i]:TOPICS_OFFSETS[i + 1]],
+    and TOPIC_CHAPTER maps each topic back to its row.
+    """
+    import numpy as np
+
+    rows, titles, topics, topic_rows = [], [], [], []
+    for class_level in CLASS_LEVELS:
+        for subject_id, subject in enumerate(SUBJECTS):
+            for num, meta in _load(class_level, subject).items():
+                topic_rows += [len(rows)] * len(meta.topics_lc)
+                topics += meta.topics_lc
+                titles.append(meta.title)
+                rows.append((class_level, subject_id, num))
+
+    counts = np.bincount(np.asarray(topic_rows, dtype=np.intp), minlength=len(rows))
+    columns = {
+        "CLASS_LEVEL": np.array([r[0] for r in rows], dtype=np.int8),
+        "SUBJECT_ID": np.array([r[1] for r in rows], dtype=np.int8),
+        "CHAPTER_NUMBER": np.array([r[2] for r in rows], dtype=np.int16),
+        "TITLES": np.array(titles, dtype=object),
+        "TOPICS_FLAT": np.array(topics, dtype=object),
+        "TOPICS_OFFSETS": np.concatenate(([0], np.cumsum(counts))).astype(np.int32),
+        "TOPIC_CHAPTER": np.array(topic_rows, dtype=np.int32),
+    }
+    for arr in columns.values():
+        arr.setflags(write=False)
+    return columns
+
+
+def count_topic_matches(tokens):
+    """
+    Per-chapter count of lowercased topics found in *tokens*, as an array
+    aligned with the column arrays (CLASS_LEVEL, SUBJECT_ID, ...).
+    """
+    import numpy as np
+
+    cols = _columns()
+    hits = np.isin(cols["TOPICS_FLAT"], list(tokens))
+    return np.bincount(cols["TOPIC_CHAPTER"][hits], minlength=len(cols["CLASS_LEVEL"]))
+
+
+# Legacy module-level names, e.g. PHYSICS_CLASS_9_CHAPTERS
+_LEGACY_NAMES = {
+    f"{subject.upper().replace(' ', '_')}_CLASS_{class_level}_CHAPTERS": (class_level, subject)
+    for class_level in CLASS_LEVELS
+    for subject in SUBJECTS
 }
+
+
+def __getattr__(name: str):
+    # PEP 562 hook: build on first access, then store in the module globals
+    # so later lookups are ordinary attribute reads
+    if name == "TOPIC_INDEX":
+        value = _topic_index()
+    elif name in _COLUMN_NAMES:
+        value = _columns()[name]
+    elif name in _LEGACY_NAMES:
+        value = _load(*_LEGACY_NAMES[name])
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    # Lazy names are listed but left out of __all__, so a star-import does
+    # not load every subject
+    return sorted((*__all__, "TOPIC_INDEX", *_COLUMN_NAMES, *_LEGACY_NAMES))
@@ -1,12 +1,49 @@
 """
 Load processed chunks into Supabase with pgvector.
 """
-from typing import List, Dict, Any
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Dict, Any, Tuple
 from dataclasses import dataclass
+import logging
 
+import numpy as np
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+from ..services.supabase_client import is_missing_rpc
 from .text_chunker import Chunk
 
 
+logger = logging.getLogger(__name__)
+
+# Concurrent 100-row inserts on the fallback path
+INSERT_CONCURRENCY = 8
+
+# Significant digits that identify any float16 value exactly
+_HALFVEC_DIGITS = 5
+
+
+def _halfvec_values(embeddings) -> np.ndarray:
+    """
+    Embeddings rounded to float16 (what the halfvec(768) column from
+    scripts/setup_supabase.sql or migrate_to_halfvec.sql stores), then to
+    5 significant digits, as float32.
+
+    Serialized with the shortest float32 repr this gives about 20% less
+    JSON than the raw float32 values, and Postgres parses every number
+    back to exactly the same float16.
+    """
+    arr = np.asarray(embeddings, dtype=np.float16).astype(np.float32)
+    with np.errstate(divide="ignore"):
+        exponent = np.floor(np.log10(np.abs(arr)))
+    exponent[~np.isfinite(exponent)] = 0
+    scale = np.power(10.0, _HALFVEC_DIGITS - 1 - exponent)
+    return (np.rint(arr * scale) / scale).astype(np.float32)
+
+
 @dataclass
 class LoadResult:
     """Result of loading operation."""
@@ -27,6 +64,33 @@ class SupabaseLoader:
         from supabase import create_client, Client
 
         self.client: Client = create_client(supabase_url, supabase_key)
+        # Cleared once insert_chunks_bulk turns out not to exist (the database
+        # hasn't run scripts/migrate_bulk_insert_chunks.sql)
+        self._bulk_rpc = True
+        # (class_level, subject, chapter_number) -> chapter id
+        self._chapter_ids: Dict[Tuple[int, str, int], str] = {}
+
+    def prefetch_chapters(self, class_level: int, subject: str) -> Dict[int, str]:
+        """
+        Fetch the ids of every existing chapter of a subject in one query.
+
+        Later get_or_create_chapter calls for these chapters are answered
+        from memory; only missing chapters go to Supabase.
+
+        Returns:
+            Mapping of chapter_number to chapter UUID
+        """
+        result = (
+            self.client.table("chapters")
+            .select("id,chapter_number")
+            .eq("class_level", class_level)
+            .eq("subject", subject)
+            .execute()
+        )
+        ids = {row["chapter_number"]: row["id"] for row in result.data}
+        for chapter_number, chapter_id in ids.items():
+            self._chapter_ids[(class_level, subject, chapter_number)] = chapter_id
+        return ids
 
     def get_or_create_chapter(
         self,
@@ -44,20 +108,14 @@ class SupabaseLoader:
         Returns:
             Chapter UUID
         """
-        # Check if chapter exists
-        result = (
-            self.client.table("chapters")
-            .select("id")
-            .eq("class_level", class_level)
-            .eq("subject", subject)
-            .eq("chapter_number", chapter_number)
-            .execute()
-        )
-
-        if result.data:
-            return result.data[0]["id"]
+        key = (class_level, subject, chapter_number)
+        chapter_id = self._chapter_ids.get(key)
+        if chapter_id is not None:
+            return chapter_id
 
-        # Create new chapter
+        # Create the chapter unless it already exists, in one atomic
+        # statement (ON CONFLICT DO NOTHING on the chapters unique key), so
+        # an existing chapter's title and source_file are left as they are
         data = {
             "class_level": class_level,
             "subject": subject,
@@ -68,14 +126,35 @@ class SupabaseLoader:
             "source_file": source_file,
         }
 
-        result = self.client.table("chapters").insert(data).execute()
-        return result.data[0]["id"]
+        result = (
+            self.client.table("chapters")
+            .upsert(
+                data,
+                on_conflict="class_level,subject,chapter_number",
+                ignore_duplicates=True,
+            )
+            .execute()
+        )
+
+        # No row back means it already existed: look up its id
+        if not result.data:
+            result = (
+                self.client.table("chapters")
+                .select("id")
+                .eq("class_level", class_level)
+                .eq("subject", subject)
+                .eq("chapter_number", chapter_number)
+                .execute()
+            )
+
+        chapter_id = self._chapter_ids[key] = result.data[0]["id"]
+        return chapter_id
 
     def load_chunks(
         self,
         chapter_id: str,
         chunks: List[Chunk],
-        embeddings: List[List[float]],
+        embeddings: np.ndarray,
     ) -> LoadResult:
         """
         Load chunks with embeddings into Supabase.
@@ -83,7 +162,7 @@ class SupabaseLoader:
         Args:
             chapter_id: UUID of the chapter
             chunks: List of Chunk objects
-            embeddings: List of embedding vectors
+            embeddings: (n, dim) array (or list) of embedding vectors
 
         Returns:
             LoadResult with stats
@@ -91,28 +170,69 @@ class SupabaseLoader:
         errors = []
         loaded = 0
 
-        # Prepare batch insert data
-        batch_data = []
-        for chunk, embedding in zip(chunks, embeddings):
-            batch_data.append(
-                {
-                    "chapter_id": chapter_id,
-                    "chunk_text": chunk.text,
-                    "chunk_index": chunk.chunk_index,
-                    "embedding": embedding,
-                    "metadata": chunk.metadata,
-                }
-            )
+        matrix = _halfvec_values(embeddings)
 
-        # Insert in batches of 100
-        batch_size = 100
-        for i in range(0, len(batch_data), batch_size):
-            batch = batch_data[i : i + batch_size]
+        # One RPC call inserts every row in a single round trip/transaction
+        if self._bulk_rpc and len(chunks):
             try:
-                self.client.table("document_chunks").insert(batch).execute()
-                loaded += len(batch)
+                if orjson is not None:
+                    # orjson writes the float32 rows straight from the array
+                    # (shortest float32 repr), skipping the per-float Python
+                    # objects and json.dumps the client would otherwise use
+                    body = orjson.dumps(
+                        {"payload": self._rows(chapter_id, chunks, matrix)},
+                        option=orjson.OPT_SERIALIZE_NUMPY,
+                    )
+                    self._post_rpc("insert_chunks_bulk", body)
+                else:
+                    payload = self._rows(chapter_id, chunks, matrix.tolist())
+                    self.client.rpc("insert_chunks_bulk", {"payload": payload}).execute()
+                return LoadResult(
+                    chunks_loaded=len(chunks),
+                    chapter_id=chapter_id,
+                    errors=errors,
+                )
             except Exception as e:
-                errors.append(f"Batch {i // batch_size}: {str(e)}")
+                if is_missing_rpc(e):
+                    logger.warning(
+                        "insert_chunks_bulk not found, using batch inserts from now on; "
+                        "run scripts/migrate_bulk_insert_chunks.sql to enable it"
+                    )
+                    self._bulk_rpc = False
+                else:
+                    # Data or network error: batch inserts for this chapter
+                    # only. The RPC is one transaction, so nothing was kept.
+                    logger.warning(
+                        f"insert_chunks_bulk failed for chapter {chapter_id}, "
+                        f"using batch inserts: {e}"
+                    )
+
+        # Convert to plain lists once, at the JSON boundary
+        batch_data = self._rows(chapter_id, chunks, matrix.tolist())
+
+        # Fallback: insert in batches of 100, up to INSERT_CONCURRENCY at a
+        # time (the client's httpx session is thread-safe)
+        batch_size = 100
+        batches = [
+            batch_data[i : i + batch_size]
+            for i in range(0, len(batch_data), batch_size)
+        ]
+        if not batches:
+            return LoadResult(chunks_loaded=0, chapter_id=chapter_id, errors=errors)
+
+        def insert(batch):
+            self.client.table("document_chunks").insert(batch).execute()
+
+        with ThreadPoolExecutor(
+            max_workers=min(INSERT_CONCURRENCY, len(batches))
+        ) as pool:
+            futures = [pool.submit(insert, batch) for batch in batches]
+            for i, (batch, future) in enumerate(zip(batches, futures)):
+                try:
+                    future.result()
+                    loaded += len(batch)
+                except Exception as e:
+                    errors.append(f"Batch {i}: {str(e)}")
 
         return LoadResult(
             chunks_loaded=loaded,
@@ -120,6 +240,30 @@ class SupabaseLoader:
             errors=errors,
         )
 
+    @staticmethod
+    def _rows(chapter_id: str, chunks: List[Chunk], embeddings) -> List[Dict[str, Any]]:
+        """document_chunks rows for a chapter; embeddings may be array rows or lists."""
+        return [
+            {
+                "chapter_id": chapter_id,
+                "chunk_text": chunk.text,
+                "chunk_index": chunk.chunk_index,
+                "embedding": embedding,
+                "metadata": chunk.metadata,
+            }
+            for chunk, embedding in zip(chunks, embeddings)
+        ]
+
+    def _post_rpc(self, func: str, body: bytes):
+        """POST an already-encoded JSON body to a PostgREST RPC endpoint."""
+        postgrest = self.client.postgrest
+        response = postgrest.session.post(
+            str(postgrest.base_url.joinpath("rpc", func)),
+            content=body,
+            headers={**postgrest.headers, "Content-Type": "application/json"},
+        )
+        response.raise_for_status()
+
     def clear_chapter_chunks(self, chapter_id: str):
         """Delete all chunks for a chapter (for re-processing)."""
         self.client.table("document_chunks").delete().eq(
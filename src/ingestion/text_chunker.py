@@ -2,13 +2,60 @@
 Text chunking strategies optimized for educational content.
 """
 from dataclasses import dataclass
-from typing import List
+from typing import List, Tuple
+import functools
 import re
 
+try:
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
 from .docx_extractor import ExtractedSection
 
+_PARA_RE = re.compile(r"\n\s*\n")
+_SENT_RE = re.compile(r"(?<=[.!?])\s+")
+_DEF_RE = re.compile(r"definition|is defined as|refers to")
+_EX_RE = re.compile(r"example|for instance|consider|suppose|let us")
+_FORMULA_TYPE_RE = re.compile(r"formula|equation|[A-Za-z]\s*=\s*[A-Za-z]")
+_EXERCISE_RE = re.compile(r"exercise|question|problem|solve|calculate|find")
+_FORMULA_RE = re.compile(r"[A-Za-z]\s*=\s*[A-Za-z0-9\*/\+\-\^]+")
+
+# Content types in _detect_content_type's priority order, then the
+# _has_formula pattern; ids are positions in this tuple
+_CONTENT_TYPES = ("definition", "example", "formula", "exercise")
+_HS_FORMULA_ID = len(_CONTENT_TYPES)
+
 
-@dataclass
+@functools.cache
+def _hyperscan_db():
+    """
+    All classifier patterns in one Hyperscan database (a SIMD DFA that
+    reports every pattern in a single pass), or None without hyperscan.
+    The definition/example/exercise patterns match caselessly, like the
+    re versions run on lowercased text.
+    """
+    if hyperscan is None:
+        return None
+    patterns = (
+        (_DEF_RE, True),
+        (_EX_RE, True),
+        (_FORMULA_TYPE_RE, False),
+        (_EXERCISE_RE, True),
+        (_FORMULA_RE, False),
+    )
+    base = hyperscan.HS_FLAG_SINGLEMATCH | hyperscan.HS_FLAG_UTF8 | hyperscan.HS_FLAG_UCP
+    db = hyperscan.Database()
+    db.compile(
+        expressions=[p.pattern.encode() for p, _ in patterns],
+        ids=list(range(len(patterns))),
+        elements=len(patterns),
+        flags=[base | (hyperscan.HS_FLAG_CASELESS if caseless else 0) for _, caseless in patterns],
+    )
+    return db
+
+
+@dataclass(slots=True)
 class Chunk:
     """Represents a text chunk for embedding."""
 
@@ -71,11 +118,13 @@ class TextChunker:
 
         # If no chunks were created (all sections too small), combine all content
         if not chunks and sections:
-            combined_content = "\n\n".join(
+            # A list, not a generator: str.join copies a generator into a
+            # list first anyway, and a comprehension fills it faster
+            combined_content = "\n\n".join([
                 f"{s.title}\n{s.content}" if s.title != "Introduction" else s.content
                 for s in sections
                 if s.content.strip()
-            )
+            ])
             has_formula = any(s.has_formula for s in sections)
             has_table = any(s.has_table for s in sections)
 
@@ -100,14 +149,13 @@ class TextChunker:
         if not content.strip():
             return []
 
-        paragraphs = self._split_paragraphs(content)
+        # Word counts are computed once per paragraph and summed per chunk
+        paragraphs = [(p, len(p.split())) for p in self._split_paragraphs(content)]
         chunks = []
         current_chunk = []
         current_word_count = 0
 
-        for para in paragraphs:
-            para_words = len(para.split())
-
+        for para, para_words in paragraphs:
             if current_word_count + para_words > self.chunk_size and current_chunk:
                 chunks.append(
                     self._create_chunk(
@@ -117,6 +165,7 @@ class TextChunker:
                         chapter_title=chapter_title,
                         has_formula=has_formula,
                         has_table=has_table,
+                        word_count=current_word_count,
                     )
                 )
                 overlap_text = self._get_overlap(current_chunk)
@@ -136,6 +185,7 @@ class TextChunker:
                     chapter_title=chapter_title,
                     has_formula=has_formula,
                     has_table=has_table,
+                    word_count=current_word_count,
                 )
             )
         elif current_chunk and chunks:
@@ -158,16 +208,15 @@ class TextChunker:
         if not content.strip():
             return []
 
-        # Split into paragraphs first
-        paragraphs = self._split_paragraphs(content)
+        # Split into paragraphs first; word counts are computed once per
+        # paragraph and summed per chunk
+        paragraphs = [(p, len(p.split())) for p in self._split_paragraphs(content)]
 
         chunks = []
         current_chunk = []
         current_word_count = 0
 
-        for para in paragraphs:
-            para_words = len(para.split())
-
+        for para, para_words in paragraphs:
             # If single paragraph is too large, split it
             if para_words > self.chunk_size:
                 # Save current chunk first
@@ -180,6 +229,7 @@ class TextChunker:
                             chapter_title=chapter_title,
                             has_formula=has_formula,
                             has_table=has_table,
+                            word_count=current_word_count,
                         )
                     )
                     current_chunk = []
@@ -214,6 +264,7 @@ class TextChunker:
                         chapter_title=chapter_title,
                         has_formula=has_formula,
                         has_table=has_table,
+                        word_count=current_word_count,
                     )
                 )
 
@@ -237,6 +288,7 @@ class TextChunker:
                     chapter_title=chapter_title,
                     has_formula=has_formula,
                     has_table=has_table,
+                    word_count=current_word_count,
                 )
             )
         elif current_chunk and chunks:
@@ -248,13 +300,13 @@ class TextChunker:
 
     def _split_paragraphs(self, text: str) -> List[str]:
         """Split text into paragraphs."""
-        paragraphs = re.split(r"\n\s*\n", text)
+        paragraphs = _PARA_RE.split(text)
         return [p.strip() for p in paragraphs if p.strip()]
 
     def _split_by_sentences(self, text: str) -> List[str]:
         """Split large text by sentences into chunk-sized pieces."""
         # Simple sentence splitting
-        sentences = re.split(r"(?<=[.!?])\s+", text)
+        sentences = _SENT_RE.split(text)
 
         chunks = []
         current = []
@@ -296,11 +348,11 @@ class TextChunker:
         chapter_title: str,
         has_formula: bool,
         has_table: bool,
+        word_count: int = None,
     ) -> Chunk:
-        """Create a Chunk object with metadata."""
+        """Create a Chunk object with metadata (word_count: if already known)."""
 
-        # Detect content type
-        content_type = self._detect_content_type(text)
+        content_type, has_formula = self._classify(text, has_formula)
 
         return Chunk(
             text=text,
@@ -309,34 +361,44 @@ class TextChunker:
                 "section_title": section_title,
                 "chapter_title": chapter_title,
                 "content_type": content_type,
-                "has_formula": has_formula or self._has_formula(text),
+                "has_formula": has_formula,
                 "has_table": has_table,
-                "word_count": len(text.split()),
+                "word_count": len(text.split()) if word_count is None else word_count,
             },
         )
 
+    def _classify(self, text: str, has_formula: bool) -> Tuple[str, bool]:
+        """
+        Content type, and has_formula or whether text contains a formula;
+        one Hyperscan pass covers both when hyperscan is installed.
+        """
+        db = _hyperscan_db()
+        if db is None:
+            return self._detect_content_type(text), has_formula or self._has_formula(text)
+
+        hits = set()
+        db.scan(text.encode(), match_event_handler=lambda id_, *_: hits.add(id_))
+        content_type = next(
+            (_CONTENT_TYPES[i] for i in range(len(_CONTENT_TYPES)) if i in hits),
+            "explanation",
+        )
+        return content_type, has_formula or _HS_FORMULA_ID in hits
+
     def _detect_content_type(self, text: str) -> str:
         """Detect the type of content in the chunk."""
         text_lower = text.lower()
 
-        if re.search(r"definition|is defined as|refers to", text_lower):
+        if _DEF_RE.search(text_lower):
             return "definition"
-        elif re.search(
-            r"example|for instance|consider|suppose|let us", text_lower
-        ):
+        elif _EX_RE.search(text_lower):
             return "example"
-        elif re.search(r"formula|equation|[A-Za-z]\s*=\s*[A-Za-z]", text):
+        elif _FORMULA_TYPE_RE.search(text):
             return "formula"
-        elif re.search(
-            r"exercise|question|problem|solve|calculate|find", text_lower
-        ):
+        elif _EXERCISE_RE.search(text_lower):
             return "exercise"
         else:
             return "explanation"
 
     def _has_formula(self, text: str) -> bool:
         """Check if text contains formulas."""
-        formula_patterns = [
-            r"[A-Za-z]\s*=\s*[A-Za-z0-9\*/\+\-\^]+",
-        ]
-        return any(re.search(p, text) for p in formula_patterns)
+        return _FORMULA_RE.search(text) is not None
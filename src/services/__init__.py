@@ -1,12 +1,43 @@
-from .groq_client import get_groq_client
-from .supabase_client import get_supabase_client
-from .opik_setup import setup_opik
-from .chat_logger import log_chat, build_chat_log_row
+"""
+Service clients (Groq, Supabase, Opik) and the chat logger.
+
+The names below resolve lazily through __getattr__, so importing one
+submodule (e.g. key_rotator from ingestion) does not load the groq,
+supabase and opik SDKs as a side effect.
+"""
+import importlib
 
 __all__ = [
     "get_groq_client",
     "get_supabase_client",
     "setup_opik",
     "log_chat",
+    "log_chats",
     "build_chat_log_row",
+    "ChatLogRow",
 ]
+
+# Exported name -> submodule that defines it
+_EXPORTS = {
+    "get_groq_client": "groq_client",
+    "get_supabase_client": "supabase_client",
+    "setup_opik": "opik_setup",
+    "log_chat": "chat_logger",
+    "log_chats": "chat_logger",
+    "build_chat_log_row": "chat_logger",
+    "ChatLogRow": "chat_logger",
+}
+
+
+def __getattr__(name: str):
+    # PEP 562 hook: import the defining submodule on first access
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(f".{module}", __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted((*globals(), *__all__))
@@ -0,0 +1,17 @@
+"""
+TLS settings shared by the service HTTP clients.
+
+Building an SSLContext loads the whole CA bundle (~50 ms), and httpx
+builds one per client by default; the Groq and Supabase pools share this
+one instead.
+"""
+import functools
+import ssl
+
+import certifi
+
+
+@functools.cache
+def ssl_context() -> ssl.SSLContext:
+    """Process-wide client SSLContext, trusting the same certifi bundle httpx uses."""
+    return ssl.create_default_context(cafile=certifi.where())
@@ -1,33 +1,66 @@
 """
 Chat interaction logger — writes each chat to the Supabase `chat_logs` table.
 """
-import json
 import traceback
+from typing import Any, Optional, TypedDict
 
 from .supabase_client import get_supabase_client
 
 
-def log_chat(row: dict) -> None:
+class ChatLogRow(TypedDict):
+    """One chat_logs row; build_chat_log_row coerces every value to a JSON-safe type."""
+
+    user_id: str
+    user_email: str
+    class_level: int
+    subject: str
+    language: str
+    original_query: str
+    revised_query: Optional[str]
+    chat_history: list
+    agent_used: Optional[str]
+    math_intent: Optional[str]
+    routing_info: dict[str, Any]
+    sources: list
+    answer: str
+    explanation: str
+    confidence: Optional[float]
+    chapter_used: Optional[int]
+
+
+def _float(value) -> Optional[float]:
+    # Plain float for numpy scalars (np.float32 is not JSON-serializable)
+    return None if value is None else float(value)
+
+
+def _int(value) -> Optional[int]:
+    return None if value is None else int(value)
+
+
+def log_chat(row: ChatLogRow) -> None:
     """Insert a row into chat_logs."""
     try:
-        # Ensure all values are JSON-serializable (convert any numpy/custom floats)
-        clean_row = {}
-        for k, v in row.items():
-            if isinstance(v, float):
-                clean_row[k] = float(v)
-            elif isinstance(v, int) and not isinstance(v, bool):
-                clean_row[k] = int(v)
-            else:
-                clean_row[k] = v
-
         supabase = get_supabase_client()
-        result = supabase.table("chat_logs").insert(clean_row).execute()
+        result = supabase.table("chat_logs").insert(row).execute()
         print(f"[chat_logger] OK — id={result.data[0]['id'] if result.data else '?'}")
     except Exception as e:
         print(f"[chat_logger] FAILED: {e}")
         traceback.print_exc()
 
 
+def log_chats(rows: list[ChatLogRow]) -> None:
+    """Insert several rows into chat_logs with a single request."""
+    if not rows:
+        return
+    try:
+        supabase = get_supabase_client()
+        supabase.table("chat_logs").insert(rows).execute()
+        print(f"[chat_logger] OK — {len(rows)} rows")
+    except Exception as e:
+        print(f"[chat_logger] FAILED ({len(rows)} rows): {e}")
+        traceback.print_exc()
+
+
 def build_chat_log_row(
     *,
     user_id: str,
@@ -38,13 +71,13 @@ def build_chat_log_row(
     original_query: str,
     chat_history: list,
     response,
-) -> dict:
+) -> ChatLogRow:
     """Build the row dict from the response object. Safe to call from any thread."""
     routing = response.routing_info
     routing_info = {
         "primary_chapter": routing.primary_chapter,
         "secondary_chapters": routing.secondary_chapters,
-        "confidence": routing.confidence,
+        "confidence": _float(routing.confidence),
         "reasoning": routing.reasoning,
         "topics_identified": routing.topics_identified,
     }
@@ -52,7 +85,7 @@ def build_chat_log_row(
     return {
         "user_id": user_id,
         "user_email": user_email,
-        "class_level": class_level,
+        "class_level": int(class_level),
         "subject": subject,
         "language": language,
         "original_query": original_query,
@@ -64,6 +97,6 @@ def build_chat_log_row(
         "sources": response.sources,
         "answer": response.answer,
         "explanation": response.explanation,
-        "confidence": response.confidence,
-        "chapter_used": response.chapter_used,
+        "confidence": _float(response.confidence),
+        "chapter_used": _int(response.chapter_used),
     }
@@ -2,58 +2,110 @@
 Groq API client with automatic key rotation on rate-limit (429).
 
 Drop-in replacement: agents use `client.chat.completions.create(...)` unchanged.
+The groq SDK is imported when the first client is built, not on import.
 """
+from __future__ import annotations
+
+import random
+import threading
 import time
 import logging
-from groq import Groq, RateLimitError
+from typing import TYPE_CHECKING
+
+from ._http import ssl_context
 from .key_rotator import KeyRotator
 from ..config import settings
 
+if TYPE_CHECKING:
+    from groq import Groq, RateLimitError
+
 logger = logging.getLogger(__name__)
 
+# Cool-down for a rate-limited key when the 429 carries no Retry-After,
+# and the longest Retry-After honoured
+DEFAULT_COOLDOWN = 1.0
+MAX_COOLDOWN = 60.0
+
+
+def _retry_after(error: RateLimitError) -> float:
+    """Seconds a 429 asked us to wait (Retry-After header), capped at MAX_COOLDOWN."""
+    try:
+        return min(float(error.response.headers["retry-after"]), MAX_COOLDOWN)
+    except (AttributeError, KeyError, TypeError, ValueError):
+        return DEFAULT_COOLDOWN
+
 
 class _CompletionsProxy:
     """Proxies `chat.completions.create()` with key rotation."""
 
     def __init__(self, rotator: KeyRotator, max_retries: int = 10):
+        from groq import DefaultHttpxClient
+
         self._rotator = rotator
-        self._clients: dict[str, Groq] = {}
         self._max_retries = max_retries
+        # key index -> time.monotonic() at which it may be used again after a 429
+        self._ready_at: dict[int, float] = {}
+        # One connection pool for every key: on rotation only the
+        # Authorization header changes, the TCP/TLS connection is reused.
+        # HTTP/2 lets concurrent requests share that connection. The TLS
+        # context is the one the Supabase pool uses.
+        self._http = DefaultHttpxClient(http2=True, verify=ssl_context())
+
+    def _new_client(self, key: str) -> Groq:
+        from groq import Groq
+
+        return Groq(api_key=key, http_client=self._http)
+
+    def _ready_index(self) -> int:
+        """
+        Current key if it is not cooling down, else the next one that isn't;
+        when every key is cooling down, sleep until the first is ready.
+        """
+        while True:
+            now = time.monotonic()
+            for _ in range(self._rotator.key_count):
+                index = self._rotator.current_index
+                if self._ready_at.get(index, 0.0) <= now:
+                    return index
+                self._rotator.next()
 
-    def _get_client(self, key: str) -> Groq:
-        if key not in self._clients:
-            self._clients[key] = Groq(api_key=key)
-        return self._clients[key]
+            # Jitter so callers released by the same cool-down don't retry
+            # in lockstep
+            wait = min(self._ready_at.values()) - now + random.uniform(0, 0.25)
+            logger.warning(
+                f"All {self._rotator.key_count} Groq keys rate-limited, "
+                f"backing off {wait:.1f}s"
+            )
+            time.sleep(max(wait, 0.0))
 
     def create(self, **kwargs):
         """Call Groq chat completions with automatic key rotation on 429."""
-        keys_tried = 0
-        total_keys = self._rotator.key_count
+        from groq import RateLimitError
 
-        for attempt in range(self._max_retries):
-            client = self._get_client(self._rotator.current_key)
+        for _ in range(self._max_retries):
+            index = self._ready_index()
+            client = self._rotator.client_at(index, self._new_client)
             try:
                 return client.chat.completions.create(**kwargs)
-            except RateLimitError:
-                keys_tried += 1
+            except RateLimitError as e:
+                # Skip this key until its Retry-After has passed
+                self._ready_at[index] = time.monotonic() + _retry_after(e)
                 self._rotator.next()
 
-                if keys_tried >= total_keys:
-                    # All keys exhausted in this round — backoff
-                    wait = min(2 ** (attempt - total_keys + 1), 60)
-                    logger.warning(
-                        f"All {total_keys} Groq keys rate-limited, "
-                        f"backing off {wait}s (attempt {attempt + 1})"
-                    )
-                    time.sleep(wait)
-                    keys_tried = 0
-
         raise RateLimitError(
             f"All Groq keys exhausted after {self._max_retries} attempts",
             response=None,
             body=None,
         )
 
+    def warm_up(self, timeout: float) -> None:
+        """
+        Open the shared connection with one unbilled models.list() call on
+        the current key: no retries, no rotation, no cool-down wait.
+        """
+        client = self._rotator.client_at(self._rotator.current_index, self._new_client)
+        client.with_options(max_retries=0, timeout=timeout).models.list()
+
 
 class _ChatProxy:
     """Proxies `chat.completions`."""
@@ -73,7 +125,20 @@ class RotatingGroqClient:
         rotator = KeyRotator(keys, name="Groq")
         self.chat = _ChatProxy(_CompletionsProxy(rotator))
 
+    def warm_up(self, timeout: float = 10.0) -> None:
+        """Open the connection pool before the first request (see _CompletionsProxy.warm_up)."""
+        self.chat.completions.warm_up(timeout)
+
+
+_client: RotatingGroqClient | None = None
+_client_lock = threading.Lock()
+
 
 def get_groq_client() -> RotatingGroqClient:
-    """Get a rotating Groq client using all configured keys."""
-    return RotatingGroqClient(settings.groq_key_list)
+    """Get the shared rotating Groq client using all configured keys."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = RotatingGroqClient(settings.groq_key_list)
+    return _client
@@ -1,35 +1,51 @@
 """
 Generic API key rotator with round-robin rotation.
 """
+from array import array
 import threading
 import logging
+from typing import Callable, Tuple, TypeVar
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
+
 
 class KeyRotator:
     """
     Round-robin API key rotator.
 
     - Cycles through keys on every call to `next()`
-    - Thread-safe via a lock
-    - Never logs key values, only indices
+    - Thread-safe: `next()` advances under a lock; `current_key` is a
+      lock-free read of the immutable key tuple at the current index
+    - Never logs key values, only indices; rotations are counted per key
+      (`rotation_stats()`) and logged only at DEBUG
+    - Memoizes one SDK client per key index (`client_at`, `next_client`),
+      so rotating back to a key reuses its client and warm connections
     """
 
     def __init__(self, keys: list[str], name: str = ""):
         if not keys:
             raise ValueError(f"{name or 'KeyRotator'}: at least one API key is required")
-        self._keys = keys
+        self._keys = tuple(keys)
         self._index = 0
         self._lock = threading.Lock()
         self._name = name or "KeyRotator"
-        logger.info(f"{self._name}: initialized with {len(keys)} key(s)")
+        self._clients: dict[int, object] = {}
+        # Rotations onto each key index
+        self._rotations = array("Q", [0] * len(self._keys))
+        logger.info("%s: initialized with %d key(s)", self._name, len(keys))
 
     @property
     def current_key(self) -> str:
         """Return the key at the current index."""
-        with self._lock:
-            return self._keys[self._index]
+        # Read on every API call, so no lock: _index is only ever replaced
+        # by next(), and a single attribute read sees either index
+        return self._keys[self._index]
+
+    @property
+    def current_index(self) -> int:
+        return self._index
 
     @property
     def key_count(self) -> int:
@@ -37,8 +53,42 @@ class KeyRotator:
 
     def next(self) -> str:
         """Advance to the next key (wraps around) and return it."""
+        return self._keys[self._advance()]
+
+    def _advance(self) -> int:
+        """Move to the next index and return it, as read under the lock."""
         with self._lock:
             old = self._index
-            self._index = (self._index + 1) % len(self._keys)
-            logger.info(f"{self._name}: rotated key {old} -> {self._index}")
-            return self._keys[self._index]
+            new = self._index = (old + 1) % len(self._keys)
+            self._rotations[new] += 1
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug("%s: rotated key %d -> %d", self._name, old, new)
+        return new
+
+    def rotation_stats(self) -> list[int]:
+        """Number of rotations onto each key index so far."""
+        with self._lock:
+            return self._rotations.tolist()
+
+    def client_at(self, index: int, factory: Callable[[str], T]) -> T:
+        """
+        Client for the key at index, built with factory(key) on first use.
+
+        One rotator caches one kind of client, so pass the same factory on
+        every call.
+        """
+        client = self._clients.get(index)
+        if client is None:
+            # Built outside the lock (SDK clients can be slow to construct);
+            # if two threads race, the first one stored wins
+            built = factory(self._keys[index])
+            with self._lock:
+                client = self._clients.setdefault(index, built)
+        return client
+
+    def next_client(self, factory: Callable[[str], T]) -> Tuple[int, T]:
+        """Advance to the next key and return (index, its cached client)."""
+        # The index this call rotated to, even if another thread has
+        # rotated again since
+        index = self._advance()
+        return index, self.client_at(index, factory)
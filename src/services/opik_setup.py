@@ -1,13 +1,20 @@
+import importlib.util
+import logging
 import os
+import threading
 from dotenv import load_dotenv
 
 load_dotenv()
 
-try:
-    import opik
-    _HAS_OPIK = True
-except ImportError:
-    _HAS_OPIK = False
+# opik (and the httpx/rich stack under it) is imported only when tracing is
+# requested, so the common no-tracing path never pays for it
+_HAS_OPIK = importlib.util.find_spec("opik") is not None
+
+logger = logging.getLogger(__name__)
+
+# setup_opik() configures once per process; later calls return at once
+_configured = False
+_configure_lock = threading.Lock()
 
 
 def _noop_decorator(fn):
@@ -15,9 +22,15 @@ def _noop_decorator(fn):
     return fn
 
 
+def _tracing_requested() -> bool:
+    """True when an Opik API key or a local Opik server URL is set."""
+    return bool(os.getenv("OPIK_API_KEY") or os.getenv("OPIK_URL_OVERRIDE"))
+
+
 def get_track_decorator():
-    """Return opik.track if available, otherwise a no-op."""
-    if _HAS_OPIK:
+    """Return opik.track if available and tracing is requested, otherwise a no-op."""
+    if _HAS_OPIK and _tracing_requested():
+        import opik
         return opik.track
     return _noop_decorator
 
@@ -25,19 +38,33 @@ def get_track_decorator():
 def setup_opik():
     """
     Initialize Opik configuration from environment variables.
+
+    Idempotent: only the first call in a process does any work.
     """
+    global _configured
+    if _configured:
+        return
+    with _configure_lock:
+        if _configured:
+            return
+        _configure()
+        _configured = True
+
+
+def _configure():
     if not _HAS_OPIK:
-        print("Opik not installed. Tracing disabled.")
+        logger.info("Opik not installed. Tracing disabled.")
         return
 
     api_key = os.getenv("OPIK_API_KEY")
     workspace_name = os.getenv("OPIK_WORKSPACE_NAME", "shaheer-shahid")
 
     if api_key:
+        import opik
         opik.configure(
             api_key=api_key,
             workspace=workspace_name
         )
-        print(f"Opik configured for workspace: {workspace_name}")
+        logger.info(f"Opik configured for workspace: {workspace_name}")
     else:
-        print("Opik API Key not found. Tracing will be disabled or local only.")
+        logger.info("Opik API Key not found. Tracing will be disabled or local only.")
@@ -0,0 +1,40 @@
+"""
+Thread-safe token bucket for client-side API rate limiting.
+"""
+import threading
+import time
+
+
+class TokenBucket:
+    """
+    Token bucket allowing `rate` calls per `per` seconds.
+
+    - Bursts up to `rate` calls, then refills continuously
+    - `acquire()` only sleeps when the bucket is actually empty
+    - Thread-safe via a lock (sleeps happen outside it)
+    """
+
+    def __init__(self, rate: float, per: float = 60.0):
+        if rate <= 0 or per <= 0:
+            raise ValueError("TokenBucket: rate and per must be positive")
+        self._capacity = float(rate)
+        self._tokens = float(rate)
+        self._fill_rate = rate / per
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self) -> None:
+        """Take one token, blocking until one is available."""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(
+                    self._capacity,
+                    self._tokens + (now - self._updated) * self._fill_rate,
+                )
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self._fill_rate
+            time.sleep(wait)
@@ -1,18 +1,95 @@
 """
 Supabase client wrapper.
+
+The supabase SDK is imported when a client is first created, not when
+this module is imported; `Client` still resolves (lazily) for callers
+that use it as a type.
 """
-from supabase import create_client, Client
-from functools import lru_cache
+from __future__ import annotations
+
+import atexit
+import threading
+from typing import TYPE_CHECKING
+
 from ..config import settings
+from ._http import ssl_context
+
+if TYPE_CHECKING:
+    from supabase import Client
+
+# Built once per process; the lock makes sure concurrent first calls
+# (e.g. during startup) create a single client and connection pool
+_client = None
+_admin_client = None
+_client_lock = threading.Lock()
+
+# Keep-alive connection pool shared by both clients (auth headers are sent
+# per request), so repeat calls skip the DNS lookup and TLS handshake
+# while a connection is idle for less than KEEPALIVE_EXPIRY seconds
+KEEPALIVE_EXPIRY = 300
+_http = None
+
+
+def _create_client(key: str) -> Client:
+    """Create a Supabase client on the shared pool; call with _client_lock held."""
+    global _http
+    import httpx
+    from supabase import ClientOptions, create_client
+
+    if _http is None:
+        _http = httpx.Client(
+            http2=True,
+            verify=ssl_context(),
+            timeout=120,
+            follow_redirects=True,
+            limits=httpx.Limits(
+                max_keepalive_connections=20, keepalive_expiry=KEEPALIVE_EXPIRY
+            ),
+        )
+        atexit.register(_http.close)
+    return create_client(
+        settings.supabase_url, key, options=ClientOptions(httpx_client=_http)
+    )
 
 
-@lru_cache()
 def get_supabase_client() -> Client:
-    """Get cached Supabase client instance."""
-    return create_client(settings.supabase_url, settings.supabase_key)
+    """Get the shared Supabase client instance."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = _create_client(settings.supabase_key)
+    return _client
 
 
-@lru_cache()
 def get_supabase_admin_client() -> Client:
-    """Get cached Supabase admin client using service role key."""
-    return create_client(settings.supabase_url, settings.supabase_service_role_key)
+    """Get the shared Supabase admin client using service role key."""
+    global _admin_client
+    if _admin_client is None:
+        with _client_lock:
+            if _admin_client is None:
+                _admin_client = _create_client(settings.supabase_service_role_key)
+    return _admin_client
+
+
+def is_missing_rpc(error: Exception) -> bool:
+    """
+    True if a PostgREST RPC call failed because no function matches its
+    name and parameters (PGRST202 / HTTP 404), e.g. a migration that adds
+    the function or a parameter has not been run yet.
+    """
+    # postgrest's APIError carries the PostgREST code; a raw httpx
+    # HTTPStatusError carries the response
+    if getattr(error, "code", None) == "PGRST202":
+        return True
+    response = getattr(error, "response", None)
+    return getattr(response, "status_code", None) == 404
+
+
+def __getattr__(name: str):
+    # PEP 562 hook: `from .supabase_client import Client` imports the SDK
+    if name == "Client":
+        from supabase import Client
+
+        return Client
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
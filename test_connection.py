@@ -1,96 +1,211 @@
 #!/usr/bin/env python3
 """
 Test network connectivity to diagnose the getaddrinfo error.
+
+Usage:
+    python test_connection.py              # all tests
+    python test_connection.py --tests 2,4  # only Supabase and DOCX
+
+Project modules are imported inside each test, so a partial run only
+loads what its tests need.
 """
+import argparse
+import socket
 import sys
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from pathlib import Path
+from urllib.parse import urlparse
 sys.path.insert(0, str(Path(__file__).parent))
 
 from dotenv import load_dotenv
 load_dotenv()
 
-print("=" * 60)
-print("NETWORK CONNECTIVITY TEST")
-print("=" * 60)
-
-# Test 1: Basic imports
-print("\n[1/5] Testing basic imports...")
-try:
-    from src.config import settings
-    print("✓ Config loaded")
-    print(f"  Supabase URL: {settings.supabase_url}")
-    print(f"  Embedding model: {settings.embedding_model}")
-except Exception as e:
-    print(f"✗ Failed: {e}")
-    sys.exit(1)
-
-# Test 2: Test Supabase connection
-print("\n[2/5] Testing Supabase connection...")
-try:
-    from src.services.supabase_client import get_supabase_client
-    supabase = get_supabase_client()
-    print("✓ Supabase client created")
-
-    # Try a simple query
-    result = supabase.table('chapters').select('id').limit(1).execute()
-    print(f"✓ Supabase query successful ({len(result.data)} rows)")
-except Exception as e:
-    print(f"✗ Supabase connection failed: {e}")
-    print(f"   Error type: {type(e).__name__}")
-    import traceback
-    traceback.print_exc()
-
-# Test 3: Test embedding model initialization
-print("\n[3/5] Testing embedding model initialization...")
-try:
-    from src.ingestion.embedding_generator import EmbeddingGenerator
-    embedder = EmbeddingGenerator(settings.embedding_model)
-    print(f"✓ Embedding generator created (backend: {embedder.backend})")
-    print(f"  Model: {embedder.model_name}")
-    print(f"  Dimension: {embedder.dimension}")
-except Exception as e:
-    print(f"✗ Embedding initialization failed: {e}")
-    import traceback
-    traceback.print_exc()
-
-# Test 4: Test DOCX extraction (no network needed)
-print("\n[4/5] Testing DOCX extraction...")
-try:
-    from src.ingestion.docx_extractor import DocxExtractor
-    extractor = DocxExtractor()
-
-    # Find a test file
-    test_file = Path("Notes/Class 9/Physics/Content/Chapter 1 - Notes (Final 1).docx")
-    if test_file.exists():
-        print(f"  Using test file: {test_file.name}")
-        doc = extractor.extract(test_file)
-        print(f"✓ DOCX extraction successful")
-        print(f"  Sections: {len(doc.sections)}")
-        print(f"  Words: {doc.metadata['word_count']}")
-    else:
-        print("  (Skipping - no test file found)")
-except Exception as e:
-    print(f"✗ DOCX extraction failed: {e}")
-    import traceback
-    traceback.print_exc()
-
-# Test 5: Test embedding generation (may download model first time)
-print("\n[5/5] Testing embedding generation...")
-try:
-    from src.ingestion.embedding_generator import EmbeddingGenerator
-    embedder = EmbeddingGenerator(settings.embedding_model)
-
-    test_text = "This is a test sentence for embedding generation."
-    print("  Generating test embedding...")
-    embedding = embedder.generate(test_text)
-    print(f"✓ Embedding generated successfully")
-    print(f"  Dimension: {len(embedding)}")
-    print(f"  First 3 values: {embedding[:3]}")
-except Exception as e:
-    print(f"✗ Embedding generation failed: {e}")
-    import traceback
-    traceback.print_exc()
-
-print("\n" + "=" * 60)
-print("TEST COMPLETE")
-print("=" * 60)
+ALL_TESTS = (1, 2, 3, 4, 5)
+
+
+def check_config() -> bool:
+    print("\n[1/5] Testing basic imports...")
+    try:
+        from src.config import settings
+        print("✓ Config loaded")
+        print(f"  Supabase URL: {settings.supabase_url}")
+        print(f"  Embedding model: {settings.embedding_model}")
+    except Exception as e:
+        print(f"✗ Failed: {e}")
+        return False
+    return True
+
+
+_embedder = None
+_embedder_lock = threading.Lock()
+
+
+def get_embedder():
+    """Shared EmbeddingGenerator for tests 3 and 5, built once."""
+    global _embedder
+    with _embedder_lock:
+        if _embedder is None:
+            from src.config import settings
+            from src.ingestion.embedding_generator import EmbeddingGenerator
+            _embedder = EmbeddingGenerator(settings.embedding_model)
+    return _embedder
+
+
+def check_host(out, url: str, timeout: float = 3.0) -> bool:
+    """Resolve and connect to url's host:443, reporting DNS and TCP separately."""
+    host = urlparse(url).hostname
+    if not host:
+        out.append(f"✗ No host in URL: {url!r}")
+        return False
+    t0 = time.perf_counter()
+    try:
+        socket.getaddrinfo(host, 443, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        out.append(f"✗ DNS lookup for {host} failed: {e}")
+        return False
+    out.append(f"  DNS ok for {host} in {(time.perf_counter() - t0) * 1000:.0f}ms")
+    t0 = time.perf_counter()
+    try:
+        socket.create_connection((host, 443), timeout=timeout).close()
+    except OSError as e:
+        out.append(f"✗ TCP connect to {host}:443 failed: {e}")
+        return False
+    out.append(f"  TCP ok in {(time.perf_counter() - t0) * 1000:.0f}ms")
+    return True
+
+
+def probe_supabase(out):
+    out.append("[2/5] Testing Supabase connection...")
+    try:
+        from src.config import settings
+
+        # DNS and TCP first, so a network failure isn't reported as an SDK error
+        if not check_host(out, settings.supabase_url):
+            return
+
+        from src.services.supabase_client import get_supabase_client
+        supabase = get_supabase_client()
+        out.append("✓ Supabase client created")
+
+        # Try a simple query
+        result = supabase.table('chapters').select('id').limit(1).execute()
+        out.append(f"✓ Supabase query successful ({len(result.data)} rows)")
+    except Exception as e:
+        out.append(f"✗ Supabase connection failed: {e}")
+        out.append(f"   Error type: {type(e).__name__}")
+        out.append(traceback.format_exc())
+
+
+def probe_embedder_init(out):
+    out.append("[3/5] Testing embedding model initialization...")
+    try:
+        embedder = get_embedder()
+        out.append(f"✓ Embedding generator created (model: {embedder.model_name})")
+        out.append(f"  Model: {embedder.model_name}")
+        out.append(f"  Dimension: {embedder.dimension}")
+    except Exception as e:
+        out.append(f"✗ Embedding initialization failed: {e}")
+        out.append(traceback.format_exc())
+
+
+def probe_docx(out):
+    out.append("[4/5] Testing DOCX extraction...")
+    try:
+        from src.ingestion.docx_extractor import DocxExtractor
+        extractor = DocxExtractor()
+
+        # Find a test file
+        test_file = Path("Notes/Class 9/Physics/Content/Chapter 1 - Notes (Final 1).docx")
+        if test_file.exists():
+            out.append(f"  Using test file: {test_file.name}")
+            doc = extractor.extract(test_file)
+            out.append(f"✓ DOCX extraction successful")
+            out.append(f"  Sections: {len(doc.sections)}")
+            out.append(f"  Words: {doc.metadata['word_count']}")
+        else:
+            out.append("  (Skipping - no test file found)")
+    except Exception as e:
+        out.append(f"✗ DOCX extraction failed: {e}")
+        out.append(traceback.format_exc())
+
+
+def probe_embedding(out):
+    out.append("[5/5] Testing embedding generation...")
+    try:
+        embedder = get_embedder()
+
+        test_text = "This is a test sentence for embedding generation."
+        out.append("  Generating test embedding...")
+        embedding = embedder.generate(test_text)
+        out.append(f"✓ Embedding generated successfully")
+        out.append(f"  Dimension: {len(embedding)}")
+        out.append(f"  First 3 values: {embedding[:3]}")
+    except Exception as e:
+        out.append(f"✗ Embedding generation failed: {e}")
+        out.append(traceback.format_exc())
+
+
+def run(probe):
+    out = []
+    probe(out)
+    return out
+
+
+PROBES = {
+    2: probe_supabase,
+    3: probe_embedder_init,
+    4: probe_docx,
+    5: probe_embedding,
+}
+
+
+def parse_tests(value: str):
+    try:
+        tests = sorted({int(t) for t in value.split(",") if t.strip()})
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"expected comma-separated test numbers, got {value!r}")
+    unknown = [t for t in tests if t not in ALL_TESTS]
+    if unknown or not tests:
+        raise argparse.ArgumentTypeError(f"tests must be among {ALL_TESTS}, got {value!r}")
+    return tests
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument(
+        "--tests",
+        type=parse_tests,
+        default=list(ALL_TESTS),
+        help="comma-separated tests to run (1=config, 2=Supabase, 3=embedder init, "
+             "4=DOCX, 5=embedding); default: all",
+    )
+    args = parser.parse_args()
+
+    print("=" * 60)
+    print("NETWORK CONNECTIVITY TEST")
+    print("=" * 60)
+
+    if 1 in args.tests and not check_config():
+        sys.exit(1)
+
+    # Tests 2-5 are independent network/disk probes. Each one collects its
+    # output lines and runs on its own thread, so total time is the slowest
+    # probe rather than the sum; results print as each probe finishes.
+    probes = [PROBES[t] for t in args.tests if t in PROBES]
+    if probes:
+        with ThreadPoolExecutor(max_workers=len(probes)) as pool:
+            futures = [pool.submit(run, probe) for probe in probes]
+            for future in as_completed(futures):
+                print()
+                print("\n".join(line.rstrip("\n") for line in future.result()))
+
+    print("\n" + "=" * 60)
+    print("TEST COMPLETE")
+    print("=" * 60)
+
+
+if __name__ == "__main__":
+    main()